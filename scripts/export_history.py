@@ -18,10 +18,39 @@ if str(ROOT_DIR) not in sys.path:
 import httpx
 
 from src.config import get_endpoints, get_settings
+from src.decimals import to_decimal
+from src.event_loop import install_uvloop
 from src.rest import RestClient
 
 
-@dataclass
+CSV_WRITE_BUFFER = 1 << 20
+CSV_WRITE_BATCH = 500
+
+TRADE_HEADERS = ["trade_id", "market", "side", "qty", "price", "value", "fee", "liquidity", "trade_type", "created_at"]
+POSITION_HEADERS = [
+    "position_id",
+    "market",
+    "side",
+    "size",
+    "open_price",
+    "exit_price",
+    "realised_pnl",
+    "created_at",
+    "closed_at",
+]
+FUNDING_HEADERS = ["funding_id", "market", "side", "size", "value", "funding_fee", "funding_rate", "paid_time"]
+
+_ZERO = Decimal("0")
+
+
+def _dec(value: Any) -> Decimal:
+    """Convert an API field to Decimal, treating missing/empty values as zero."""
+    if not value:
+        return _ZERO
+    return to_decimal(value)
+
+
+@dataclass(slots=True)
 class TradeRecord:
     trade_id: str
     market: str
@@ -49,7 +78,7 @@ class TradeRecord:
         ]
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionRecord:
     position_id: str
     market: str
@@ -75,7 +104,7 @@ class PositionRecord:
         ]
 
 
-@dataclass
+@dataclass(slots=True)
 class FundingRecord:
     record_id: str
     market: str
@@ -111,6 +140,7 @@ async def fetch_paginated(
     params: Optional[Dict[str, Any]] = None,
 ) -> AsyncIterator[Dict[str, Any]]:
     query = dict(params or {})
+    prev_cursor = query.get("cursor")
     while True:
         response = await client.get(path, params=query)
         items = response.get("data") or []
@@ -118,97 +148,107 @@ async def fetch_paginated(
             yield item
         pagination = response.get("pagination") or {}
         cursor = pagination.get("cursor")
-        count = pagination.get("count")
-        if not cursor or not count or not items:
-            break
-        query = dict(query)
-        if query.get("cursor") == cursor:
+        if not items or not cursor or not pagination.get("count") or cursor == prev_cursor:
             break
-        query["cursor"] = cursor
+        # httpx encodes params when the request is sent, so the same dict can be reused per page.
+        query["cursor"] = prev_cursor = cursor
 
 
-async def collect_trades(client: RestClient, market: Optional[str]) -> List[TradeRecord]:
+async def collect_trades(client: RestClient, market: Optional[str]) -> AsyncIterator[TradeRecord]:
     params: Dict[str, Any] = {"limit": 200}
     if market:
         params["market"] = market
 
-    records: List[TradeRecord] = []
     async for trade in fetch_paginated(client, "/user/trades", params=params):
-        records.append(
-            TradeRecord(
-                trade_id=str(trade.get("id")),
-                market=str(trade.get("market")),
-                side=str(trade.get("side")),
-                qty=Decimal(str(trade.get("qty") or trade.get("filledQty") or "0")),
-                price=Decimal(str(trade.get("price") or trade.get("averagePrice") or "0")),
-                value=Decimal(str(trade.get("value") or "0")),
-                fee=Decimal(str(trade.get("fee") or "0")),
-                is_taker=bool(trade.get("isTaker", False)),
-                trade_type=str(trade.get("tradeType")),
-                created_time=int(trade.get("createdTime") or 0),
-            )
+        yield TradeRecord(
+            trade_id=str(trade.get("id")),
+            market=str(trade.get("market")),
+            side=str(trade.get("side")),
+            qty=_dec(trade.get("qty") or trade.get("filledQty")),
+            price=_dec(trade.get("price") or trade.get("averagePrice")),
+            value=_dec(trade.get("value")),
+            fee=_dec(trade.get("fee")),
+            is_taker=bool(trade.get("isTaker", False)),
+            trade_type=str(trade.get("tradeType")),
+            created_time=int(trade.get("createdTime") or 0),
         )
-    return records
 
 
-async def collect_positions_history(client: RestClient, market: Optional[str]) -> List[PositionRecord]:
+async def collect_positions_history(client: RestClient, market: Optional[str]) -> AsyncIterator[PositionRecord]:
     params: Dict[str, Any] = {"limit": 200}
     if market:
         params["market"] = market
 
-    records: List[PositionRecord] = []
     async for position in fetch_paginated(client, "/user/positions/history", params=params):
         exit_price_raw = position.get("exitPrice")
         closed_time_raw = position.get("closedTime")
-        records.append(
-            PositionRecord(
-                position_id=str(position.get("id")),
-                market=str(position.get("market")),
-                side=str(position.get("side")),
-                size=Decimal(str(position.get("size") or "0")),
-                open_price=Decimal(str(position.get("openPrice") or "0")),
-                exit_price=Decimal(str(exit_price_raw)) if exit_price_raw is not None else None,
-                realised_pnl=Decimal(str(position.get("realisedPnl") or "0")),
-                created_time=int(position.get("createdTime") or 0),
-                closed_time=int(closed_time_raw) if closed_time_raw is not None else None,
-            )
+        yield PositionRecord(
+            position_id=str(position.get("id")),
+            market=str(position.get("market")),
+            side=str(position.get("side")),
+            size=_dec(position.get("size")),
+            open_price=_dec(position.get("openPrice")),
+            exit_price=to_decimal(exit_price_raw) if exit_price_raw is not None else None,
+            realised_pnl=_dec(position.get("realisedPnl")),
+            created_time=int(position.get("createdTime") or 0),
+            closed_time=int(closed_time_raw) if closed_time_raw is not None else None,
         )
-    return records
 
 
 async def collect_funding_history(
     client: RestClient,
     market: Optional[str],
     from_time: int,
-) -> List[FundingRecord]:
+) -> AsyncIterator[FundingRecord]:
     params: Dict[str, Any] = {"limit": 200, "fromTime": from_time}
     if market:
         params["market"] = market
 
-    records: List[FundingRecord] = []
     async for funding in fetch_paginated(client, "/user/funding/history", params=params):
-        records.append(
-            FundingRecord(
-                record_id=str(funding.get("id")),
-                market=str(funding.get("market")),
-                side=str(funding.get("side")),
-                size=Decimal(str(funding.get("size") or "0")),
-                value=Decimal(str(funding.get("value") or "0")),
-                funding_fee=Decimal(str(funding.get("fundingFee") or "0")),
-                funding_rate=Decimal(str(funding.get("fundingRate") or "0")),
-                paid_time=int(funding.get("paidTime") or 0),
-            )
+        yield FundingRecord(
+            record_id=str(funding.get("id")),
+            market=str(funding.get("market")),
+            side=str(funding.get("side")),
+            size=_dec(funding.get("size")),
+            value=_dec(funding.get("value")),
+            funding_fee=_dec(funding.get("fundingFee")),
+            funding_rate=_dec(funding.get("fundingRate")),
+            paid_time=int(funding.get("paidTime") or 0),
         )
-    return records
 
 
-def write_csv(path: Path, headers: Iterable[str], rows: Iterable[List[str]]) -> None:
+async def write_csv(path: Path, headers: Iterable[str], records: AsyncIterator[Any]) -> int:
+    """Stream records into ``path`` as pages arrive and return the number of rows written."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as fp:
+    written = 0
+    # A 1 MiB buffer turns the per-row writes into a few large syscalls.
+    with path.open("w", newline="", encoding="utf-8", buffering=CSV_WRITE_BUFFER) as fp:
         writer = csv.writer(fp)
         writer.writerow(list(headers))
-        for row in rows:
-            writer.writerow(row)
+        batch: List[List[str]] = []
+        async for record in records:
+            batch.append(record.to_row())
+            if len(batch) >= CSV_WRITE_BATCH:
+                writer.writerows(batch)
+                written += len(batch)
+                batch.clear()
+        writer.writerows(batch)
+        written += len(batch)
+    return written
+
+
+async def _export_positions_or_skip(client: RestClient, market: Optional[str], path: Path) -> int:
+    try:
+        return await write_csv(path, POSITION_HEADERS, collect_positions_history(client, market))
+    except httpx.HTTPStatusError as exc:
+        print(
+            f"⚠️ positions history API failed ({exc.response.status_code}): {exc.response.url}"
+            " — skipping positions.csv"
+        )
+        # Pages streamed before the failure are already on disk; reset the file so it matches the 0 reported.
+        with path.open("w", newline="", encoding="utf-8") as fp:
+            csv.writer(fp).writerow(POSITION_HEADERS)
+        return 0
 
 
 async def async_main(args: argparse.Namespace) -> None:
@@ -216,44 +256,44 @@ async def async_main(args: argparse.Namespace) -> None:
     endpoints = get_endpoints()
     client = RestClient(settings, endpoints)
 
-    try:
-        trades = await collect_trades(client, args.market)
-        try:
-            positions = await collect_positions_history(client, args.market)
-        except httpx.HTTPStatusError as exc:
-            print(
-                f"⚠️ positions history API failed ({exc.response.status_code}): {exc.response.url}"
-                " — skipping positions.csv"
-            )
-            positions = []
-        funding = await collect_funding_history(client, args.market, args.funding_from)
-    finally:
-        await client.aclose()
-
     output_dir = Path(args.output).expanduser().resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    write_csv(
-        output_dir / "trades.csv",
-        ["trade_id", "market", "side", "qty", "price", "value", "fee", "liquidity", "trade_type", "created_at"],
-        (record.to_row() for record in trades),
-    )
-
-    write_csv(
-        output_dir / "positions.csv",
-        ["position_id", "market", "side", "size", "open_price", "exit_price", "realised_pnl", "created_at", "closed_at"],
-        (record.to_row() for record in positions),
+    exports = (
+        ("trades.csv", "trades", write_csv(output_dir / "trades.csv", TRADE_HEADERS, collect_trades(client, args.market))),
+        ("positions.csv", "positions", _export_positions_or_skip(client, args.market, output_dir / "positions.csv")),
+        (
+            "funding.csv",
+            "funding records",
+            write_csv(
+                output_dir / "funding.csv",
+                FUNDING_HEADERS,
+                collect_funding_history(client, args.market, args.funding_from),
+            ),
+        ),
     )
+    try:
+        # The three endpoints paginate independently, so walk their cursor chains concurrently
+        # and write each page to disk as soon as it arrives. return_exceptions keeps one failed
+        # export from abandoning the others while the client is being closed underneath them.
+        results = await asyncio.gather(*(export for _, _, export in exports), return_exceptions=True)
+    finally:
+        await client.aclose()
 
-    write_csv(
-        output_dir / "funding.csv",
-        ["funding_id", "market", "side", "size", "value", "funding_fee", "funding_rate", "paid_time"],
-        (record.to_row() for record in funding),
-    )
+    summary: List[str] = []
+    failed = False
+    for (filename, label, _), result in zip(exports, results):
+        if isinstance(result, BaseException):
+            failed = True
+            print(f"❌ {filename} export failed: {result!r}")
+            # Drop the partial file rather than leave a half-written CSV behind.
+            (output_dir / filename).unlink(missing_ok=True)
+        else:
+            summary.append(f"{result} {label}")
 
-    print(
-        f"Exported {len(trades)} trades, {len(positions)} positions, {len(funding)} funding records to {output_dir}"
-    )
+    print(f"Exported {', '.join(summary) or 'nothing'} to {output_dir}")
+    if failed:
+        raise SystemExit(1)
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -277,6 +317,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
 def main() -> None:
     parser = build_arg_parser()
     args = parser.parse_args()
+    install_uvloop()
     asyncio.run(async_main(args))
 
 
@@ -12,6 +12,7 @@ import websockets
 from websockets.exceptions import ConnectionClosed, InvalidStatusCode
 
 from .config import EndpointConfig, RuntimeSettings
+from .json_codec import json_loads
 
 
 class AccountStream:
@@ -42,22 +43,33 @@ class AccountStream:
             self._headers.append(("X-Subaccount-Id", subaccount_id))
 
         self._debug_ws = os.getenv("EXTENDED_DEBUG_ACCOUNT_WS", "0") == "1"
+        # Account frames are small JSON messages, where per-message deflate costs more CPU than it saves.
+        self._compression = "deflate" if os.getenv("EXTENDED_WS_COMPRESSION", "").lower() == "deflate" else None
+
+        # Long-lived pooled client so fee refreshes reuse the keep-alive connection.
+        self._http = httpx.AsyncClient(
+            base_url=self._rest_base,
+            headers={key: value for key, value in self._headers},
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=32, keepalive_expiry=30.0),
+            http2=True,
+        )
 
     async def _fetch_fees(self) -> Dict[str, Any]:
         """Fetches the current maker/taker fee rates."""
-        url = f"{self._rest_base}/user/fees"
-        headers = {key: value for key, value in self._headers}
-        async with httpx.AsyncClient(timeout=10.0, headers=headers) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            data = r.json().get("data", [])
-            return {
-                row.get("market", "ALL"): {
-                    "makerFeeRate": row.get("makerFeeRate"),
-                    "takerFeeRate": row.get("takerFeeRate"),
-                }
-                for row in data
+        r = await self._http.get("/user/fees")
+        r.raise_for_status()
+        data = json_loads(r.content).get("data", [])
+        return {
+            row.get("market", "ALL"): {
+                "makerFeeRate": row.get("makerFeeRate"),
+                "takerFeeRate": row.get("takerFeeRate"),
             }
+            for row in data
+        }
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
     async def updates(self) -> AsyncIterator[Dict[str, Any]]:
         """Connects to the account WebSocket and yields events."""
@@ -65,34 +77,38 @@ class AccountStream:
             fees_map = await self._fetch_fees()
             yield {"type": "CONFIG", "data": {"fees": fees_map}}
         except Exception as e:
-            logging.warning(f"[account_ws] Could not fetch fees: {e} (continuing without fee rates)")
+            logging.warning("[account_ws] Could not fetch fees: %s (continuing without fee rates)", e)
 
         backoff = 0.5
         while True:
             try:
                 if self._debug_ws:
-                    logging.info(f"[account_ws] Connecting to {self._url}")
+                    logging.info("[account_ws] Connecting to %s", self._url)
 
                 async with websockets.connect(
                     self._url,
                     extra_headers=self._headers,
                     ping_interval=15,
                     ping_timeout=10,
+                    compression=self._compression,
+                    max_queue=1024,
+                    read_limit=2**20,
+                    write_limit=2**20,
                 ) as ws:
-                    logging.info(f"[account_ws] Connection successful to {self._url}")
+                    logging.info("[account_ws] Connection successful to %s", self._url)
                     backoff = 0.5  # Reset backoff on successful connection
 
                     async for raw in ws:
                         try:
-                            yield json.loads(raw)
+                            yield json_loads(raw)
                         except json.JSONDecodeError:
                             yield {"type": "RAW", "data": raw}
 
             except (InvalidStatusCode, OSError, ConnectionClosed) as e:
-                logging.error(f"[account_ws] Connection error: {e}. Retrying in {backoff:.1f}s")
+                logging.error("[account_ws] Connection error: %s. Retrying in %.1fs", e, backoff)
                 await asyncio.sleep(backoff)
                 backoff = min(backoff * 2, 8.0)
             except Exception as e:
-                logging.error(f"[account_ws] Unexpected error: {e}. Retrying in {backoff:.1f}s")
+                logging.error("[account_ws] Unexpected error: %s. Retrying in %.1fs", e, backoff)
                 await asyncio.sleep(backoff)
                 backoff = min(backoff * 2, 8.0)
@@ -6,15 +6,17 @@ import json
 import logging
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import httpx
 from x10.perpetual.orders import SelfTradeProtectionLevel
 
 from .account_ws import AccountStream
-from .config import BotConfig, EndpointConfig, MarketConfig, RuntimeSettings, get_endpoints, get_settings, load_bot_config
+from .config import BotConfig, MarketConfig, get_endpoints, get_settings, load_bot_config
+from .decimals import to_decimal
+from .event_loop import install_uvloop
 from .executor import ExecutionEngine, build_trading_client
 from .logging_setup import setup_logging
 from .md_source import MarketDataSource
@@ -26,32 +28,56 @@ from .risk import RiskConfig, RiskManager
 
 DEBUG_ACCOUNT_EVENTS = os.getenv("EXTENDED_DEBUG_ACCOUNT_EVENTS", "0") == "1"
 
+STATUS_LOG_INTERVAL_SEC = 60.0
 
-@dataclass
+_ZERO = Decimal("0")
+_ONE = Decimal("1")
+_NEG_ONE = Decimal("-1")
+_FLAT_EXPOSURE = Decimal("1e-6")
+
+_LONG_SIDES = frozenset(("BUY", "LONG"))
+_TRADE_SIDES = frozenset(("BUY", "LONG", "SELL", "SHORT"))
+_TRUTHY_FLAGS = frozenset(("1", "true", "t", "yes"))
+# 帳戶推送欄位命名不一致，依序嘗試
+_ENTRY_PRICE_KEYS = ("open_price", "openPrice", "entry_price", "entryPrice")
+_MARK_PRICE_KEYS = ("mark_price", "markPrice")
+
+
+@dataclass(slots=True)
 class MarketState:
     """Mutable per-market state shared across任務的市場狀態."""
 
-    inventory: Decimal = Decimal("0")
-    entry_price: Decimal = Decimal("0")
+    # Decimal 不可變，預設值可共用 _ZERO
+    inventory: Decimal = _ZERO
+    entry_price: Decimal = _ZERO
     mid_price: Decimal | None = None
     position_open_time: float | None = None
     last_rebalance_notice: float = 0.0
+    # 由 _orderbook_consumer 在盤口更新時設置，喚醒 quote_loop
+    book_dirty: asyncio.Event = field(default_factory=asyncio.Event)
 
     def inventory_age_minutes(self) -> Optional[float]:
-        if self.position_open_time is None or self.inventory == Decimal("0"):
+        if self.position_open_time is None or self.inventory == _ZERO:
             return None
         elapsed = time.monotonic() - self.position_open_time
         if elapsed < 0:
             return 0.0
         return elapsed / 60.0
 
+    def clear_position(self) -> None:
+        self.inventory = _ZERO
+        self.entry_price = _ZERO
+        self.mid_price = None
+        self.position_open_time = None
+        self.last_rebalance_notice = 0.0
+
 
-@dataclass
+@dataclass(slots=True)
 class AccountState:
     """紀錄帳戶層級權益與可用資金，供風控動態調整。"""
 
-    equity: Decimal = Decimal("0")
-    available: Decimal = Decimal("0")
+    equity: Decimal = _ZERO
+    available: Decimal = _ZERO
 
 
 async def quote_loop(
@@ -61,63 +87,82 @@ async def quote_loop(
     quote_engine: QuoteEngine,
     execution: ExecutionEngine,
     risk_manager: RiskManager,
-    pnl: PnLTracker,
     state: MarketState,
     account_state: AccountState,
 ) -> None:
-    funding_rate = Decimal("0")
+    funding_rate = _ZERO
+    # quote_interval：盤口無變動時最長的等待；min_requote_interval：兩次報價至少間隔多久
     quote_interval = max(bot_cfg.quote_loop_ms, 50) / 1000.0
+    if bot_cfg.min_requote_ms is None:
+        min_requote_interval = quote_interval
+    else:
+        min_requote_interval = max(bot_cfg.min_requote_ms, 50) / 1000.0
     max_net_usd = Decimal(str(bot_cfg.risk.max_net_position_usd))
     cap_usd = Decimal(str(market_cfg.quote_notional_cap_usd))
     min_units_cfg = Decimal(str(market_cfg.min_order_size))
+    leverage_limit = Decimal(str(market_cfg.leverage)) if market_cfg.leverage > 0 else _ZERO
+    age_spread_display = float(_ONE + Decimal(str(market_cfg.position_age_spread_multiplier)))
+
+    root_logger = logging.getLogger()
+
+    # 狀態日誌以單調時鐘節流 - 每60秒（1分鐘）記錄一次，與報價頻率無關
+    next_status_log = time.monotonic()
+
+    last_sizing_key: Optional[tuple[Decimal, Decimal]] = None
+    max_net_units = base_order_units = _ZERO
 
-    # 添加日誌計數器 - 每60秒（1分鐘）記錄一次
-    log_counter = 0
-    log_interval_loops = int(60 / quote_interval)  # 1分鐘對應的循環次數
+    book_dirty = state.book_dirty
 
     while True:
+        tick_start = time.monotonic()
+        # 先清除再讀取盤口：之後到達的更新都會觸發下一次報價
+        book_dirty.clear()
         mid = orderbook.mid_price()
         sigma = orderbook.sigma()
         if mid is None or mid <= 0:
-            await asyncio.sleep(quote_interval)
+            await _wait_for_book_update(book_dirty, quote_interval)
             continue
 
         state.mid_price = mid
 
-        if state.inventory == Decimal("0"):
+        if state.inventory == _ZERO:
             state.position_open_time = None
             state.last_rebalance_notice = 0.0
         elif state.position_open_time is None:
             state.position_open_time = time.monotonic()
 
-        leverage_limit = Decimal(str(market_cfg.leverage)) if market_cfg.leverage > 0 else Decimal("0")
         limited_net_usd = max_net_usd
-        if leverage_limit > 0 and account_state.equity > Decimal("0"):
+        if leverage_limit > 0 and account_state.equity > _ZERO:
             leverage_cap = account_state.equity * leverage_limit
             limited_net_usd = min(max_net_usd, leverage_cap)
 
-        max_net_units = Decimal("0") if limited_net_usd <= 0 else limited_net_usd / mid
-        max_order_units = Decimal("0") if cap_usd <= 0 else cap_usd / mid
+        # 單位上限只取決於 (mid, limited_net_usd)；盤口未變時沿用上次結果，省去 Decimal 除法
+        sizing_key = (mid, limited_net_usd)
+        if sizing_key != last_sizing_key:
+            last_sizing_key = sizing_key
+            net_units = _ZERO if limited_net_usd <= 0 else limited_net_usd / mid
+            max_net_units = net_units
+            base_order_units = _ZERO if cap_usd <= 0 else cap_usd / mid
 
-        if max_order_units <= Decimal("0"):
-            max_order_units = min_units_cfg
-        else:
-            max_order_units = max(max_order_units, min_units_cfg)
+            if base_order_units <= _ZERO:
+                base_order_units = min_units_cfg
+            else:
+                base_order_units = max(base_order_units, min_units_cfg)
 
-        if max_net_units <= Decimal("0"):
-            max_net_units = min_units_cfg
-        else:
-            max_net_units = max(max_net_units, min_units_cfg)
+            if max_net_units <= _ZERO:
+                max_net_units = min_units_cfg
+            else:
+                max_net_units = max(max_net_units, min_units_cfg)
 
-        if limited_net_usd > Decimal("0"):
-            per_side_cap_units = limited_net_usd / mid
-            if per_side_cap_units <= Decimal("0"):
-                per_side_cap_units = min_units_cfg
-            max_order_units = min(max_order_units, per_side_cap_units)
-            max_order_units = max(max_order_units, min_units_cfg)
+            if limited_net_usd > _ZERO:
+                per_side_cap_units = net_units
+                if per_side_cap_units <= _ZERO:
+                    per_side_cap_units = min_units_cfg
+                base_order_units = min(base_order_units, per_side_cap_units)
+                base_order_units = max(base_order_units, min_units_cfg)
 
         inventory = state.inventory
-        max_order_units = max(max_order_units, abs(inventory))
+        max_order_units = max(base_order_units, abs(inventory))
 
         risk_manager.update_limits(max_net_units, max_order_units)
 
@@ -127,33 +172,35 @@ async def quote_loop(
         decision = quote_engine.compute_quote(
             mid,
             inventory,
-            sigma or Decimal("0"),
+            sigma or _ZERO,
             funding_rate,
             position_age_minutes=age_minutes,
             best_bid=best.bid.price if best and best.bid else None,
             best_ask=best.ask.price if best and best.ask else None,
         )
 
-        # 格式化日誌輸出 - 只顯示關鍵信息到小數點後三位
-        bid_bps = float((mid - decision.bid_price) / mid * 10000)
-        ask_bps = float((decision.ask_price - mid) / mid * 10000)
-
-        # 只在計數器到達時記錄日誌
-        if log_counter % log_interval_loops == 0:
-            bid_bps = float((mid - decision.bid_price) / mid * 10000)
-            ask_bps = float((decision.ask_price - mid) / mid * 10000)
-            age_display = age_minutes if age_minutes is not None else 0.0
+        # 只在到達記錄時間時輸出；格式化只在日誌實際輸出時進行
+        now = time.monotonic()
+        if now >= next_status_log and root_logger.isEnabledFor(logging.INFO):
+            next_status_log = now + STATUS_LOG_INTERVAL_SEC
+            fmid = float(mid)
+            fbid = float(decision.bid_price)
+            fask = float(decision.ask_price)
             logging.info(
-                f"[{market_cfg.name}] "
-                f"mid={float(mid):.2f} | "
-                f"inventory={float(inventory):.4f} | "
-                f"age={age_display:.1f}m | "
-                f"fair_price={float(decision.fair_price):.2f} | "
-                f"σ={float(sigma or 0):.5f} | "
-                f"inv={float(inventory):.3f} | "
-                f"bid={float(decision.bid_price):.2f} (-{bid_bps:.2f}bps) | "
-                f"ask={float(decision.ask_price):.2f} (+{ask_bps:.2f}bps) | "
-                f"spread={float(decision.half_spread * 10000):.2f}bps"
+                "[%s] mid=%.2f | inventory=%.4f | age=%.1fm | fair_price=%.2f | σ=%.5f | inv=%.3f | "
+                "bid=%.2f (-%.2fbps) | ask=%.2f (+%.2fbps) | spread=%.2fbps",
+                market_cfg.name,
+                fmid,
+                float(inventory),
+                age_minutes if age_minutes is not None else 0.0,
+                float(decision.fair_price),
+                float(sigma or 0),
+                float(inventory),
+                fbid,
+                (fmid - fbid) / fmid * 10000,
+                fask,
+                (fask - fmid) / fmid * 10000,
+                float(decision.half_spread * 10000),
             )
 
         if (
@@ -169,36 +216,227 @@ async def quote_loop(
                     age_minutes,
                     market_cfg.position_age_minutes,
                     float(market_cfg.position_age_k_multiplier),
-                    float(Decimal("1") + Decimal(str(market_cfg.position_age_spread_multiplier))),
+                    age_spread_display,
                 )
                 state.last_rebalance_notice = now_notice
-        
-        log_counter += 1
-        
+
         capped_bid = min(decision.bid_size, max_order_units)
         capped_ask = min(decision.ask_size, max_order_units)
 
         if capped_bid < min_units_cfg:
-            capped_bid = Decimal("0")
+            capped_bid = _ZERO
         if capped_ask < min_units_cfg:
-            capped_ask = Decimal("0")
+            capped_ask = _ZERO
 
         bid_allowed = risk_manager.can_place_order(inventory, capped_bid, side=1)
         ask_allowed = risk_manager.can_place_order(inventory, capped_ask, side=-1)
-        bid_size = capped_bid if bid_allowed else Decimal("0")
-        ask_size = capped_ask if ask_allowed else Decimal("0")
+        bid_size = capped_bid if bid_allowed else _ZERO
+        ask_size = capped_ask if ask_allowed else _ZERO
+
+        # decision 為本 tick 新建且不外流，直接覆寫尺寸即可（BaseModel 預設不做賦值驗證）
+        decision.bid_size = bid_size
+        decision.ask_size = ask_size
+        try:
+            await execution.process_quote(decision)
+        except Exception as exc:
+            # 單一市場的下單失敗只影響本 tick；若往上拋會被 TaskGroup 連帶取消所有市場
+            logging.error("[%s] process_quote failed: %r", market_cfg.name, exc)
+
+        # 先守住最小報價間隔，之後若盤口仍未變動，最多再等到 quote_interval 為止
+        elapsed = time.monotonic() - tick_start
+        if elapsed < min_requote_interval:
+            await asyncio.sleep(min_requote_interval - elapsed)
+        idle_left = quote_interval - (time.monotonic() - tick_start)
+        if idle_left > 0:
+            await _wait_for_book_update(book_dirty, idle_left)
+
+
+async def _wait_for_book_update(book_dirty: asyncio.Event, timeout: float) -> None:
+    """Return when the order book changes, or after ``timeout`` seconds at the latest."""
+    try:
+        await asyncio.wait_for(book_dirty.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+def _first_of(payload: Dict[str, object], keys: Tuple[str, ...]) -> object:
+    """Equivalent of ``payload.get(k1) or payload.get(k2) or ...`` over ``keys``."""
+    value = None
+    for key in keys:
+        value = payload.get(key)
+        if value:
+            return value
+    return value
+
+
+def _get_state(states: Dict[str, MarketState], market: str) -> MarketState:
+    """Look up a market's state, creating it only when missing (unlike setdefault's eager default)."""
+    state = states.get(market)
+    if state is None:
+        state = states[market] = MarketState()
+    return state
+
+
+def _open_marks(states: Dict[str, MarketState]) -> Iterator[Tuple[Decimal, Decimal, Decimal]]:
+    """Yield (inventory, mid, entry) for every market that can be marked to market."""
+    for state in states.values():
+        if state.mid_price is not None and state.entry_price != _ZERO:
+            yield state.inventory, state.mid_price, state.entry_price
+
+
+def _handle_position(
+    data: Dict[str, Any],
+    states: Dict[str, MarketState],
+    pnl: PnLTracker,
+    account_state: AccountState,
+) -> None:
+    positions = data.get("positions") or []
+    is_snapshot = data.get("isSnapshot", False)
+    seen_markets = set()
+
+    for pos in positions:
+        market = pos.get("market")
+        if not market:
+            continue
+        seen_markets.add(market)
+        state = _get_state(states, market)
+        size = to_decimal(pos.get("size", "0"))
+        signed_size = -size if (pos.get("side") or "").upper() == "SHORT" else size
+        prev_inventory = state.inventory
+        state.inventory = signed_size
+        if state.inventory == _ZERO:
+            state.position_open_time = None
+            state.last_rebalance_notice = 0.0
+        elif prev_inventory == _ZERO or (prev_inventory > 0 and state.inventory < 0) or (
+            prev_inventory < 0 and state.inventory > 0
+        ):
+            state.position_open_time = time.monotonic()
+        entry_price_value = _first_of(pos, _ENTRY_PRICE_KEYS)
+        state.entry_price = to_decimal(entry_price_value) if entry_price_value is not None else _ZERO
+        mark_price_value = _first_of(pos, _MARK_PRICE_KEYS)
+        if mark_price_value is not None:
+            state.mid_price = to_decimal(mark_price_value)
+
+    if is_snapshot:
+        markets_to_clear = set(states.keys()) - seen_markets
+    elif not positions:
+        markets_to_clear = set(states.keys())
+    else:
+        markets_to_clear = {market for market in states.keys() if market not in seen_markets}
+
+    for market in markets_to_clear:
+        states[market].clear_position()
+
+
+def _handle_trade(
+    data: Dict[str, Any],
+    states: Dict[str, MarketState],
+    pnl: PnLTracker,
+    account_state: AccountState,
+) -> None:
+    trades = data.get("trades") or []
+    for trade in trades:
+        market = trade.get("market")
+        state = _get_state(states, market)
+        price = to_decimal(trade.get("price", "0"))
+        size = to_decimal(trade.get("size") or trade.get("qty") or trade.get("quantity") or "0")
+        if size == _ZERO:
+            continue
+
+        signed = trade.get("signed_size") or trade.get("signedSize") or trade.get("signedQty")
+        if signed is not None:
+            try:
+                trade_delta = to_decimal(signed)
+            except Exception:
+                trade_delta = _ZERO
+        else:
+            side = (trade.get("side") or "").upper()
+            direction = _ONE if side in _LONG_SIDES else _NEG_ONE
+            liquidity_flag = (trade.get("liquidity") or "").upper()
+            is_taker_raw = trade.get("isTaker")
+            if is_taker_raw is not None:
+                if isinstance(is_taker_raw, str):
+                    is_taker = is_taker_raw.lower() in _TRUTHY_FLAGS
+                else:
+                    is_taker = bool(is_taker_raw)
+            else:
+                is_taker = None
 
-        adjusted = decision.model_copy(update={"bid_size": bid_size, "ask_size": ask_size})
-        await execution.process_quote(adjusted)
+            if is_taker is False or (liquidity_flag == "MAKER" and side in _TRADE_SIDES):
+                direction = -direction
+            trade_delta = size * direction
 
-        if state.inventory != Decimal("0") and state.entry_price != Decimal("0"):
-            pnl.mark_to_market(
-                inventory=state.inventory,
-                current_mid=mid,
-                entry_price=state.entry_price,
+        prev_inventory = state.inventory
+        updated_inventory = prev_inventory + trade_delta
+        if updated_inventory == _ZERO:
+            state.entry_price = _ZERO
+        else:
+            same_direction = (prev_inventory > 0 and updated_inventory > 0) or (
+                prev_inventory < 0 and updated_inventory < 0
             )
+            if prev_inventory == _ZERO or not same_direction:
+                state.entry_price = price
+            else:
+                abs_prev = abs(prev_inventory)
+                weighted = (abs_prev * state.entry_price) + (size * price)
+                state.entry_price = weighted / (abs_prev + size)
+        state.inventory = updated_inventory
+        if state.inventory == _ZERO:
+            state.position_open_time = None
+            state.last_rebalance_notice = 0.0
+        elif prev_inventory == _ZERO or (prev_inventory > 0 and state.inventory < 0) or (
+            prev_inventory < 0 and state.inventory > 0
+        ):
+            state.position_open_time = time.monotonic()
+
+        mid = state.mid_price or price
+        pnl.record_fill(price=price, size=size, side=(trade.get("side") or ""), mid_at_fill=mid)
+
+        fee_value = trade.get("fee")
+        if fee_value is not None:
+            pnl.record_fee(-to_decimal(fee_value))
 
-        await asyncio.sleep(quote_interval)
+
+def _handle_balance(
+    data: Dict[str, Any],
+    states: Dict[str, MarketState],
+    pnl: PnLTracker,
+    account_state: AccountState,
+) -> None:
+    balance = data.get("balance") or {}
+    equity_value = balance.get("equity") or balance.get("Equity")
+    available_value = (
+        balance.get("availableForTrade")
+        or balance.get("available")
+        or balance.get("AvailableForTrade")
+    )
+    exposure_value = balance.get("exposure") or balance.get("Exposure")
+    if equity_value is not None:
+        try:
+            account_state.equity = to_decimal(equity_value)
+        except Exception:
+            pass
+    if available_value is not None:
+        try:
+            account_state.available = to_decimal(available_value)
+        except Exception:
+            pass
+    if exposure_value is not None:
+        try:
+            exposure = to_decimal(exposure_value)
+        except Exception:
+            exposure = None
+        if exposure is not None and exposure.copy_abs() <= _FLAT_EXPOSURE:
+            for state in states.values():
+                state.clear_position()
+
+
+# 帳戶事件類型 -> 處理函式，避免每個事件走 if/elif 比對
+_ACCOUNT_HANDLERS = {
+    "POSITION": _handle_position,
+    "TRADE": _handle_trade,
+    "BALANCE": _handle_balance,
+}
 
 
 async def account_loop(
@@ -207,178 +445,25 @@ async def account_loop(
     pnl: PnLTracker,
     account_state: AccountState,
 ) -> None:
+    debug_logger = logging.getLogger()
     async for event in stream.updates():
-        event_type = event.get("type")
-        data = event.get("data") or {}
-
-        if DEBUG_ACCOUNT_EVENTS:
-            logging.info(f"Account Event: {json.dumps(event)}")
-
-        if event_type == "POSITION":
-            positions = data.get("positions") or []
-            is_snapshot = data.get("isSnapshot", False)
-            seen_markets = set()
-
-            for pos in positions:
-                market = pos.get("market")
-                if not market:
-                    continue
-                seen_markets.add(market)
-                state = states.setdefault(market, MarketState())
-                size = Decimal(str(pos.get("size", "0")))
-                side = (pos.get("side") or "").upper()
-                signed_size = size if side != "SHORT" else -size
-                prev_inventory = state.inventory
-                state.inventory = signed_size
-                if state.inventory == Decimal("0"):
-                    state.position_open_time = None
-                    state.last_rebalance_notice = 0.0
-                elif prev_inventory == Decimal("0") or (prev_inventory > 0 and state.inventory < 0) or (
-                    prev_inventory < 0 and state.inventory > 0
-                ):
-                    state.position_open_time = time.monotonic()
-                entry_price_value = (
-                    pos.get("open_price")
-                    or pos.get("openPrice")
-                    or pos.get("entry_price")
-                    or pos.get("entryPrice")
-                )
-                state.entry_price = Decimal(str(entry_price_value)) if entry_price_value is not None else Decimal("0")
-                mark_price_value = pos.get("mark_price") or pos.get("markPrice")
-                if mark_price_value is not None:
-                    state.mid_price = Decimal(str(mark_price_value))
-                if state.mid_price is not None and state.entry_price != Decimal("0"):
-                    pnl.mark_to_market(
-                        inventory=state.inventory,
-                        current_mid=state.mid_price,
-                        entry_price=state.entry_price,
-                    )
+        if DEBUG_ACCOUNT_EVENTS and debug_logger.isEnabledFor(logging.INFO):
+            logging.info("Account Event: %s", json.dumps(event))
 
-            if is_snapshot:
-                markets_to_clear = set(states.keys()) - seen_markets
-            elif not positions:
-                markets_to_clear = set(states.keys())
-            else:
-                markets_to_clear = {market for market in states.keys() if market not in seen_markets}
-
-            for market in markets_to_clear:
-                state = states.setdefault(market, MarketState())
-                state.inventory = Decimal("0")
-                state.entry_price = Decimal("0")
-                state.mid_price = None
-                state.position_open_time = None
-                state.last_rebalance_notice = 0.0
-
-        elif event_type == "TRADE":
-            trades = data.get("trades") or []
-            for trade in trades:
-                market = trade.get("market")
-                state = states.setdefault(market, MarketState())
-                price = Decimal(str(trade.get("price", "0")))
-                size = Decimal(str(trade.get("size") or trade.get("qty") or trade.get("quantity") or "0"))
-                if size == Decimal("0"):
-                    continue
-
-                signed = trade.get("signed_size") or trade.get("signedSize") or trade.get("signedQty")
-                if signed is not None:
-                    try:
-                        trade_delta = Decimal(str(signed))
-                    except Exception:
-                        trade_delta = Decimal("0")
-                else:
-                    side = (trade.get("side") or "").upper()
-                    direction = Decimal("1") if side in {"BUY", "LONG"} else Decimal("-1")
-                    liquidity_flag = (trade.get("liquidity") or "").upper()
-                    is_taker_raw = trade.get("isTaker")
-                    if is_taker_raw is not None:
-                        if isinstance(is_taker_raw, str):
-                            is_taker = is_taker_raw.lower() in {"1", "true", "t", "yes"}
-                        else:
-                            is_taker = bool(is_taker_raw)
-                    else:
-                        is_taker = None
-
-                    if is_taker is False:
-                        direction *= Decimal("-1")
-                    elif liquidity_flag == "MAKER" and side in {"BUY", "LONG", "SELL", "SHORT"}:
-                        direction *= Decimal("-1")
-                    trade_delta = size * direction
-
-                prev_inventory = state.inventory
-                updated_inventory = prev_inventory + trade_delta
-                if updated_inventory == Decimal("0"):
-                    state.entry_price = Decimal("0")
-                else:
-                    same_direction = (prev_inventory > 0 and updated_inventory > 0) or (
-                        prev_inventory < 0 and updated_inventory < 0
-                    )
-                    if prev_inventory == Decimal("0") or not same_direction:
-                        state.entry_price = price
-                    else:
-                        weighted = (abs(prev_inventory) * state.entry_price) + (size * price)
-                        state.entry_price = weighted / (abs(prev_inventory) + size)
-                state.inventory = updated_inventory
-                if state.inventory == Decimal("0"):
-                    state.position_open_time = None
-                    state.last_rebalance_notice = 0.0
-                elif prev_inventory == Decimal("0") or (prev_inventory > 0 and state.inventory < 0) or (
-                    prev_inventory < 0 and state.inventory > 0
-                ):
-                    state.position_open_time = time.monotonic()
-
-                mid = state.mid_price or price
-                pnl.record_fill(price=price, size=size, side=(trade.get("side") or ""), mid_at_fill=mid)
-
-                fee_value = trade.get("fee")
-                if fee_value is not None:
-                    pnl.record_fee(Decimal(str(fee_value)) * Decimal("-1"))
-
-                if state.entry_price != Decimal("0") and state.mid_price is not None:
-                    pnl.mark_to_market(
-                        inventory=state.inventory,
-                        current_mid=state.mid_price,
-                        entry_price=state.entry_price,
-                    )
-
-        elif event_type == "BALANCE":
-            balance = data.get("balance") or {}
-            equity_value = balance.get("equity") or balance.get("Equity")
-            available_value = (
-                balance.get("availableForTrade")
-                or balance.get("available")
-                or balance.get("AvailableForTrade")
-            )
-            exposure_value = balance.get("exposure") or balance.get("Exposure")
-            if equity_value is not None:
-                try:
-                    account_state.equity = Decimal(str(equity_value))
-                except Exception:
-                    pass
-            if available_value is not None:
-                try:
-                    account_state.available = Decimal(str(available_value))
-                except Exception:
-                    pass
-            if exposure_value is not None:
-                try:
-                    exposure = Decimal(str(exposure_value))
-                except Exception:
-                    exposure = None
-                if exposure is not None and exposure.copy_abs() <= Decimal("1e-6"):
-                    for state in states.values():
-                        state.inventory = Decimal("0")
-                        state.entry_price = Decimal("0")
-                        state.mid_price = None
-                        state.position_open_time = None
-                        state.last_rebalance_notice = 0.0
+        handler = _ACCOUNT_HANDLERS.get(event.get("type"))
+        if handler is not None:
+            handler(event.get("data") or {}, states, pnl, account_state)
 
 
-async def monitor_pnl(pnl: PnLTracker, interval: float = 1.0) -> None:
+async def monitor_pnl(pnl: PnLTracker, states: Dict[str, MarketState], interval: float = 1.0) -> None:
+    root_logger = logging.getLogger()
     while True:
-        snapshot = pnl.snapshot()
-        # Convert Decimal objects to strings for JSON serialization
-        log_snapshot = {k: str(v) for k, v in snapshot.items()}
-        logging.info(f"PnL Snapshot: {json.dumps(log_snapshot)}")
+        # 未實現損益只在此處由各市場狀態重算；報價與帳戶迴圈只更新狀態
+        pnl.mark_to_market_all(_open_marks(states))
+        # Only serialise the snapshot when the line will actually be emitted
+        if root_logger.isEnabledFor(logging.INFO):
+            # default=str renders the Decimal values as strings
+            logging.info("PnL Snapshot: %s", json.dumps(pnl.snapshot(), default=str))
         await asyncio.sleep(interval)
 
 
@@ -388,13 +473,17 @@ async def _orderbook_consumer(
     source: MarketDataSource,
     state: MarketState,
 ) -> None:
-    i = 0
+    received = 0
+    next_status_log = time.monotonic()
     async for snapshot in source.orderbook_snapshots(market):
         orderbook.ingest_snapshot(snapshot)
         state.mid_price = orderbook.mid_price()
-        if i % 100 == 0:  # Log every 100 snapshots to avoid spamming
-            logging.info(f"[{market}] Received snapshot #{i}, new mid_price: {state.mid_price}")
-        i += 1
+        state.book_dirty.set()
+        now = time.monotonic()
+        if now >= next_status_log:  # Time-gated to avoid spamming regardless of feed rate
+            logging.info("[%s] Received snapshot #%d, new mid_price: %s", market, received, state.mid_price)
+            next_status_log = now + STATUS_LOG_INTERVAL_SEC
+        received += 1
 
 
 def _build_quote_engine(market_cfg: MarketConfig) -> QuoteEngine:
@@ -429,79 +518,77 @@ def _build_risk_manager(bot_cfg: BotConfig) -> RiskManager:
     return RiskManager(config=risk_config)
 
 
-async def _arm_dead_mans_switch(bot_cfg: BotConfig, settings: RuntimeSettings, endpoints: EndpointConfig) -> None:
+async def _arm_dead_mans_switch(bot_cfg: BotConfig, rest_client: RestClient) -> None:
     if bot_cfg.dead_mans_switch_sec <= 0:
         return
 
-    headers = {"User-Agent": settings.user_agent}
-    if settings.api_key:
-        headers["X-Api-Key"] = settings.api_key
-
-    url = f"{str(endpoints.rest_base).rstrip('/')}/user/deadmanswitch"
     params = {"countdownTime": bot_cfg.dead_mans_switch_sec}
 
     try:
-        async with httpx.AsyncClient(headers=headers) as client:
-            response = await client.post(url, params=params)
-            response.raise_for_status()
+        await rest_client.post("/user/deadmanswitch", params=params)
+        logging.info("Dead man's switch armed for %s seconds.", bot_cfg.dead_mans_switch_sec)
+    except httpx.HTTPStatusError as exc:
+        logging.error(
+            "Failed to arm dead man's switch. Status: %s, Response: %s", exc.response.status_code, exc.response.text
+        )
+    except Exception as exc:
+        logging.error("Failed to arm dead man's switch: %s", exc)
 
-        if response.status_code == 200:
-            logging.info(f"Dead man's switch armed for {bot_cfg.dead_mans_switch_sec} seconds.")
-        else:
-            logging.error(
-                f"Failed to arm dead man's switch. Status: {response.status_code}, Response: {response.text}"
-            )
 
-    except Exception as exc:
-        logging.error(f"Failed to arm dead man's switch: {exc}")
+# tradingConfig 欄位 -> MarketConfig 欄位（minPriceChange 同時作為報價 tick）
+_RULE_MAP = (
+    ("minOrderSize", ("min_order_size",)),
+    ("minOrderSizeChange", ("min_order_size_change",)),
+    ("minPriceChange", ("min_price_change", "price_tick")),
+)
 
 
-async def _hydrate_market_trading_rules(bot_cfg: BotConfig, settings, endpoints) -> None:
-    rest_client = RestClient(settings, endpoints)
-    try:
-        for market_cfg in bot_cfg.markets:
-            try:
-                response = await rest_client.get("/info/markets", params={"market": market_cfg.name})
-            except Exception as exc:  # pragma: no cover - network dependent
-                logging.error(f"Failed to get market rules for {market_cfg.name}: {exc}")
-                continue
+async def _hydrate_market_trading_rules(bot_cfg: BotConfig, rest_client: RestClient) -> None:
+    # Fetch every market's rules concurrently so startup waits one round-trip instead of N
+    responses = await asyncio.gather(
+        *(rest_client.get("/info/markets", params={"market": market_cfg.name}) for market_cfg in bot_cfg.markets),
+        return_exceptions=True,
+    )
+    for market_cfg, response in zip(bot_cfg.markets, responses):
+        if isinstance(response, asyncio.CancelledError):
+            # 啟動被取消時不可把取消當成單一市場失敗吞掉
+            raise response
+        if isinstance(response, BaseException):  # pragma: no cover - network dependent
+            logging.error("Failed to get market rules for %s: %s", market_cfg.name, response)
+            continue
 
-            data = response.get("data") or []
-            if not data:
-                logging.warning(f"Market rules for {market_cfg.name} are missing in API response.")
-                continue
+        data = response.get("data") or []
+        if not data:
+            logging.warning("Market rules for %s are missing in API response.", market_cfg.name)
+            continue
 
-            trading_cfg = data[0].get("tradingConfig", {})
-            min_order = trading_cfg.get("minOrderSize")
-            min_order_change = trading_cfg.get("minOrderSizeChange")
-            price_tick = trading_cfg.get("minPriceChange")
-
-            if min_order is not None:
-                market_cfg.min_order_size = float(min_order)
-            if min_order_change is not None:
-                market_cfg.min_order_size_change = float(min_order_change)
-            if price_tick is not None:
-                market_cfg.min_price_change = float(price_tick)
-                market_cfg.price_tick = float(price_tick)
-
-            if market_cfg.min_price_change is not None:
-                server_tick = Decimal(str(market_cfg.min_price_change))
-                if server_tick != Decimal("1.0"):
-                    logging.warning(
-                        f"[{market_cfg.name}] API reports price_tick={server_tick}, "
-                        "but orderbook shows integer prices. Overriding to 1.0"
-                    )
-                    market_cfg.min_price_change = 1.0
-                    market_cfg.price_tick = 1.0
+        trading_cfg = data[0].get("tradingConfig", {})
+        for wire_key, cfg_attrs in _RULE_MAP:
+            raw_value = trading_cfg.get(wire_key)
+            if raw_value is None:
+                continue
+            value = float(raw_value)
+            for cfg_attr in cfg_attrs:
+                setattr(market_cfg, cfg_attr, value)
 
-            logging.info(
-                f"Hydrated market rules for {market_cfg.name}: "
-                f"min_order_size={market_cfg.min_order_size}, "
-                f"min_order_size_change={market_cfg.min_order_size_change}, "
-                f"price_tick={market_cfg.price_tick}"
-            )
-    finally:
-        await rest_client.aclose()
+        if market_cfg.min_price_change is not None:
+            server_tick = Decimal(str(market_cfg.min_price_change))
+            if server_tick != Decimal("1.0"):
+                logging.warning(
+                    "[%s] API reports price_tick=%s, but orderbook shows integer prices. Overriding to 1.0",
+                    market_cfg.name,
+                    server_tick,
+                )
+                market_cfg.min_price_change = 1.0
+                market_cfg.price_tick = 1.0
+
+        logging.info(
+            "Hydrated market rules for %s: min_order_size=%s, min_order_size_change=%s, price_tick=%s",
+            market_cfg.name,
+            market_cfg.min_order_size,
+            market_cfg.min_order_size_change,
+            market_cfg.price_tick,
+        )
 
 
 async def run() -> None:
@@ -509,11 +596,16 @@ async def run() -> None:
     endpoints = get_endpoints()
     bot_cfg = load_bot_config()
 
-    # First, hydrate the market rules to get the correct precision
-    await _hydrate_market_trading_rules(bot_cfg, settings, endpoints)
-    
-    # Then, arm the dead man's switch
-    await _arm_dead_mans_switch(bot_cfg, settings, endpoints)
+    # Startup REST calls share one client so the second call reuses the first one's connection
+    rest_client = RestClient(settings, endpoints)
+    try:
+        # First, hydrate the market rules to get the correct precision
+        await _hydrate_market_trading_rules(bot_cfg, rest_client)
+
+        # Then, arm the dead man's switch
+        await _arm_dead_mans_switch(bot_cfg, rest_client)
+    finally:
+        await rest_client.aclose()
 
     market_data = MarketDataSource(settings=settings, endpoints=endpoints)
     trading_client = await build_trading_client(settings)
@@ -521,17 +613,18 @@ async def run() -> None:
     try:
         logging.info("--- Checking Account Info ---")
         balance = await trading_client.account.get_balance()
-        logging.info(f"Balance: {balance.to_pretty_json()}")
+        balance_json = balance.to_pretty_json()
+        logging.info("Balance: %s", balance_json)
         positions = await trading_client.account.get_positions()
-        logging.info(f"Positions: {positions.to_pretty_json()}")
+        logging.info("Positions: %s", positions.to_pretty_json())
         logging.info("--- Account Info OK ---")
     except Exception as e:
-        logging.error(f"--- FAILED to get account info: {e} ---")
+        logging.error("--- FAILED to get account info: %s ---", e)
         return
 
     account_state = AccountState()
     try:
-        balance_payload = json.loads(balance.to_pretty_json())
+        balance_payload = json.loads(balance_json)
         if isinstance(balance_payload, dict):
             balance_data = balance_payload.get("data") or balance_payload
             equity_value = balance_data.get("equity") or balance_data.get("Equity")
@@ -556,7 +649,7 @@ async def run() -> None:
     try:
         stp_level = SelfTradeProtectionLevel[bot_cfg.stp.upper()]
     except KeyError:
-        logging.warning(f"Unsupported STP level '{bot_cfg.stp}', defaulting to ACCOUNT.")
+        logging.warning("Unsupported STP level '%s', defaulting to ACCOUNT.", bot_cfg.stp)
         stp_level = SelfTradeProtectionLevel.ACCOUNT
     account_stream = AccountStream(settings=settings, endpoints=endpoints)
     pnl = PnLTracker()
@@ -568,56 +661,56 @@ async def run() -> None:
 
     market_states: Dict[str, MarketState] = {cfg.name: MarketState() for cfg in enabled_markets}
 
-    tasks = [
-        asyncio.create_task(account_loop(account_stream, market_states, pnl, account_state)),
-        asyncio.create_task(monitor_pnl(pnl, interval=600.0)),  # 10 minutes
-    ]
-
-    # Now, with hydrated rules, create the market-specific components
-    for market_cfg in enabled_markets:
-        state = market_states[market_cfg.name]
-        orderbook = OrderBook(market=market_cfg.name)
-        quote_engine = _build_quote_engine(market_cfg)
-        risk_manager = _build_risk_manager(bot_cfg)
-        execution = ExecutionEngine(
-            market_cfg=market_cfg,
-            trading_client=trading_client,
-            replace_threshold_bps=Decimal(str(market_cfg.replace_threshold_bps)),
-            post_only=market_cfg.post_only,
-            stp_level=stp_level,
-            risk_manager=risk_manager,
-        )
-        tasks.append(
-            asyncio.create_task(
-                _orderbook_consumer(
-                    market=market_cfg.name,
-                    orderbook=orderbook,
-                    source=market_data,
-                    state=state,
-                )
-            )
-        )
-        tasks.append(
-            asyncio.create_task(
-                quote_loop(
+    # Caps concurrent order REST calls across all markets so bursts of replaces stay within the client pool.
+    order_slots = asyncio.Semaphore(bot_cfg.max_concurrent_orders)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(account_loop(account_stream, market_states, pnl, account_state))
+            tg.create_task(monitor_pnl(pnl, market_states, interval=600.0))  # 10 minutes
+
+            # Now, with hydrated rules, create the market-specific components
+            for market_cfg in enabled_markets:
+                state = market_states[market_cfg.name]
+                orderbook = OrderBook(market=market_cfg.name)
+                quote_engine = _build_quote_engine(market_cfg)
+                risk_manager = _build_risk_manager(bot_cfg)
+                execution = ExecutionEngine(
                     market_cfg=market_cfg,
-                    bot_cfg=bot_cfg,
-                    orderbook=orderbook,
-                    quote_engine=quote_engine,
-                    execution=execution,
+                    trading_client=trading_client,
+                    replace_threshold_bps=Decimal(str(market_cfg.replace_threshold_bps)),
+                    post_only=market_cfg.post_only,
+                    stp_level=stp_level,
                     risk_manager=risk_manager,
-                    pnl=pnl,
-                    state=state,
-                    account_state=account_state,
+                    order_slots=order_slots,
                 )
-            )
-        )
-
-    await asyncio.gather(*tasks)
+                tg.create_task(
+                    _orderbook_consumer(
+                        market=market_cfg.name,
+                        orderbook=orderbook,
+                        source=market_data,
+                        state=state,
+                    )
+                )
+                tg.create_task(
+                    quote_loop(
+                        market_cfg=market_cfg,
+                        bot_cfg=bot_cfg,
+                        orderbook=orderbook,
+                        quote_engine=quote_engine,
+                        execution=execution,
+                        risk_manager=risk_manager,
+                        state=state,
+                        account_state=account_state,
+                    )
+                )
+    finally:
+        await account_stream.aclose()
 
 
 def main() -> None:
     setup_logging()
+    install_uvloop()
     try:
         asyncio.run(run())
     except KeyboardInterrupt:
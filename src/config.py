@@ -74,8 +74,11 @@ class FeesOverride(BaseModel):
 class BotConfig(BaseModel):
     stp: str = "ACCOUNT"
     quote_loop_ms: int = 250
+    # 兩次報價的最小間隔；未設定時沿用 quote_loop_ms，盤口事件不會提早喚醒，維持固定節奏
+    min_requote_ms: Optional[int] = None
     replace_coalesce_ms: int = 400
     dead_mans_switch_sec: int = 120
+    max_concurrent_orders: int = 16
     risk: RiskSettings = RiskSettings()
     markets: List[MarketConfig] = Field(default_factory=list)
     fees_override: FeesOverride = FeesOverride()
@@ -121,8 +124,9 @@ def get_settings() -> RuntimeSettings:
     return _load_environment()
 
 
+@lru_cache(maxsize=1)
 def get_endpoints() -> EndpointConfig:
-    """Return API endpoints for the configured environment."""
+    """Return cached API endpoints for the configured environment."""
 
     settings = get_settings()
     if settings.environment not in ENDPOINTS:
@@ -0,0 +1,13 @@
+"""Decimal coercion for values decoded from the exchange's JSON payloads."""
+from __future__ import annotations
+
+from decimal import Decimal
+
+
+def to_decimal(value: object) -> Decimal:
+    """Decimal from a wire value, skipping the str() round-trip for numeric strings."""
+    if isinstance(value, str):
+        return Decimal(value)
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
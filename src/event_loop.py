@@ -0,0 +1,16 @@
+"""Event loop selection shared by the bot and the maintenance scripts."""
+from __future__ import annotations
+
+import asyncio
+import sys
+
+
+def install_uvloop() -> None:
+    """Use uvloop's libuv event loop when it is available (not on Windows)."""
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
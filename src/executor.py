@@ -4,7 +4,8 @@ from __future__ import annotations
 import asyncio
 import logging
 from dataclasses import dataclass
-from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_CEILING, Decimal
+from decimal import Decimal
+from functools import partial
 from typing import Dict, Optional, Protocol
 
 from x10.perpetual.accounts import StarkPerpetualAccount
@@ -27,6 +28,7 @@ class TradingClientProtocol(Protocol):
         post_only: bool,
         time_in_force: TimeInForce,
         self_trade_protection_level: SelfTradeProtectionLevel,
+        previous_order_id: Optional[str] = None,
     ) -> object:
         ...
 
@@ -34,12 +36,39 @@ class TradingClientProtocol(Protocol):
         ...
 
 
-@dataclass
+@dataclass(slots=True)
 class LiveOrder:
     order_id: int
     price: Decimal
     size: Decimal
     side: OrderSide
+    # 價格偏離超過此絕對值才重掛（= price * threshold，下單時算一次）
+    replace_band: Decimal = Decimal("0")
+    # 交易所 external id，供 previous_order_id 原子改單使用
+    external_id: Optional[str] = None
+
+
+def _positive_decimal(value: object) -> Optional[Decimal]:
+    """Convert a config value to Decimal, returning None when missing, invalid or not positive."""
+    if value is None:
+        return None
+    try:
+        dec = Decimal(str(value))
+    except Exception:
+        return None
+    return dec if dec > 0 else None
+
+
+def _floor_to_step(value: Decimal, step: Decimal) -> Decimal:
+    # Exact integer quotient; for the positive sizes/prices handled here `//` is a floor
+    return (value // step) * step
+
+
+def _ceil_to_step(value: Decimal, step: Decimal) -> Decimal:
+    units, remainder = divmod(value, step)
+    if remainder:
+        units += 1
+    return units * step
 
 
 class TradingClientAdapter:
@@ -61,6 +90,7 @@ class TradingClientAdapter:
         post_only: bool,
         time_in_force: TimeInForce = TimeInForce.GTT,
         self_trade_protection_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
+        previous_order_id: Optional[str] = None,
     ) -> object:
         response = await self._client.place_order(
             market_name=market_name,
@@ -68,6 +98,7 @@ class TradingClientAdapter:
             price=price,
             side=side,
             post_only=post_only,
+            previous_order_id=previous_order_id,
             time_in_force=time_in_force,
             self_trade_protection_level=self_trade_protection_level,
         )
@@ -110,26 +141,55 @@ class ExecutionEngine:
         market_cfg: MarketConfig,
         trading_client: TradingClientProtocol,
         replace_threshold_bps: Decimal,
+        order_slots: asyncio.Semaphore,
         post_only: bool = True,
         stp_level: SelfTradeProtectionLevel = SelfTradeProtectionLevel.ACCOUNT,
         risk_manager: Optional[RiskManager] = None,
     ) -> None:
         self._market_cfg = market_cfg
         self._market = market_cfg.name
+        # 交易所精度規則在建構時解析一次（市場規則已於啟動時 hydrate 完成）
+        self._min_order_size = Decimal(str(market_cfg.min_order_size))
+        # 數量步進：優先用交易所的 min_order_size_change；沒有就整數步進 1
+        self._quantity_step = _positive_decimal(getattr(market_cfg, "min_order_size_change", None)) or Decimal("1")
+        # 價格步進：min_price_change > price_tick > fallback
+        self._price_tick = (
+            _positive_decimal(getattr(market_cfg, "min_price_change", None))
+            or _positive_decimal(getattr(market_cfg, "price_tick", None))
+            or Decimal("0.00001")  # 安全預設
+        )
+        self._min_rounded_size = _ceil_to_step(self._min_order_size, self._quantity_step)
         self._client = trading_client
         self._post_only = post_only
         self._stp_level = stp_level
         self._threshold = replace_threshold_bps / Decimal("10000")
         self._orders: Dict[OrderSide, LiveOrder] = {}
-        self._lock = asyncio.Lock()
         self._risk_manager = risk_manager
+        # 由呼叫端依 BotConfig.max_concurrent_orders 建立，所有市場共用同一組名額
+        self._order_slots = order_slots
+        # 每邊固定不變的下單參數先綁定好，送單時只需帶價格與數量
+        self._submit = {
+            side: partial(
+                trading_client.place_order,
+                market_name=self._market,
+                side=side,
+                post_only=post_only,
+                time_in_force=TimeInForce.GTT,
+                self_trade_protection_level=stp_level,
+            )
+            for side in (OrderSide.BUY, OrderSide.SELL)
+        }
 
     async def process_quote(self, decision: QuoteDecision) -> None:
-        async with self._lock:
-            await asyncio.gather(
-                self._sync_side(OrderSide.BUY, decision.bid_price, decision.bid_size),
-                self._sync_side(OrderSide.SELL, decision.ask_price, decision.ask_size),
-            )
+        """Sync both sides to ``decision``.
+
+        Single-writer contract: each engine is driven by exactly one quote_loop, which awaits
+        this call before computing the next decision, so calls never overlap and need no lock.
+        """
+        await asyncio.gather(
+            self._sync_side(OrderSide.BUY, decision.bid_price, decision.bid_size),
+            self._sync_side(OrderSide.SELL, decision.ask_price, decision.ask_size),
+        )
 
     async def _sync_side(self, side: OrderSide, target_price: Decimal, target_size: Decimal) -> None:
         live = self._orders.get(side)
@@ -141,103 +201,126 @@ class ExecutionEngine:
             await self._place(side, target_price, target_size)
             return
         if live.price == 0:
+            await self._replace(live, target_price, target_size)
+            return
+        # |Δp| / p > threshold  <=>  |Δp| > p * threshold，後者在下單時已預先算好
+        if abs(live.price - target_price) > live.replace_band or live.size != target_size:
+            await self._replace(live, target_price, target_size)
+
+    async def _replace(self, live: LiveOrder, price: Decimal, size: Decimal) -> None:
+        """Swap ``live`` for a new order in one request, falling back to cancel + place.
+
+        Only an explicit exchange rejection (the SDK raises ``ValueError`` for error responses)
+        proves the replace was not applied. Timeouts, connection drops and rate limiting leave
+        the outcome unknown or call for backing off, so they propagate and the next quote tick
+        re-evaluates from the tracked state.
+        """
+        if live.external_id is None:
             await self._cancel(live)
-            await self._place(side, target_price, target_size)
+            await self._place(live.side, price, size)
             return
-        price_diff = abs(live.price - target_price) / live.price
-        if price_diff > self._threshold or live.size != target_size:
+        try:
+            await self._place(live.side, price, size, replacing=live)
+        except ValueError as exc:
+            logging.warning(
+                "[%s] replace of order %s rejected (%s); falling back to cancel + place",
+                self._market,
+                live.order_id,
+                exc,
+            )
             await self._cancel(live)
-            await self._place(side, target_price, target_size)
+            await self._place(live.side, price, size)
 
-    async def _place(self, side: OrderSide, price: Decimal, size: Decimal) -> None:
+    async def _place(
+        self,
+        side: OrderSide,
+        price: Decimal,
+        size: Decimal,
+        replacing: Optional[LiveOrder] = None,
+    ) -> None:
         """Place a rounded order that respects exchange precision:
         - quantity rounded by `min_order_size_change` (Minimum Change in Trade Size)
         - price rounded by `min_price_change` (or legacy `price_tick`)
         """
-        # --- 1) 基本規則（全部轉成 Decimal） ---
-        min_order_size = Decimal(str(self._market_cfg.min_order_size))
-
-        # 數量步進：優先用交易所的 min_order_size_change；沒有就整數步進 1
-        quantity_step = None
-        msc = getattr(self._market_cfg, "min_order_size_change", None)
-        if msc is not None:
-            try:
-                msc_dec = Decimal(str(msc))
-                if msc_dec > 0:
-                    quantity_step = msc_dec
-            except Exception:
-                pass
-        if quantity_step is None or quantity_step <= 0:
-            quantity_step = Decimal("1")
-
-        # 價格步進：min_price_change > price_tick > fallback
-        price_tick_dec = None
-        mpc = getattr(self._market_cfg, "min_price_change", None)
-        if mpc is not None:
-            try:
-                p = Decimal(str(mpc))
-                if p > 0:
-                    price_tick_dec = p
-            except Exception:
-                pass
-        if price_tick_dec is None:
-            pt = getattr(self._market_cfg, "price_tick", None)
-            if pt is not None:
-                try:
-                    p = Decimal(str(pt))
-                    if p > 0:
-                        price_tick_dec = p
-                except Exception:
-                    pass
-        if price_tick_dec is None or price_tick_dec <= 0:
-            price_tick_dec = Decimal("0.00001")  # 安全預設
+        # --- 1) 基本規則已於 __init__ 解析並快取 ---
+        min_order_size = self._min_order_size
+        quantity_step = self._quantity_step
+        price_tick_dec = self._price_tick
 
         # --- 2) 對齊數量（向下取整到步進，至少滿足最小單量） ---
-        rounded_size = (size / quantity_step).to_integral_value(rounding=ROUND_FLOOR) * quantity_step
+        rounded_size = _floor_to_step(size, quantity_step)
         if rounded_size < min_order_size:
-            # 拉到最小單量，並向上扣齊步進
-            rounded_size = (min_order_size / quantity_step).to_integral_value(rounding=ROUND_CEILING) * quantity_step
+            # 拉到最小單量（已預先向上扣齊步進）
+            rounded_size = self._min_rounded_size
 
         # --- 3) 對齊價格（買單 floor、賣單 ceil） ---
         if side == OrderSide.BUY:
-            rounded_price = (price / price_tick_dec).to_integral_value(rounding=ROUND_FLOOR) * price_tick_dec
+            rounded_price = _floor_to_step(price, price_tick_dec)
         else:
-            rounded_price = (price / price_tick_dec).to_integral_value(rounding=ROUND_CEILING) * price_tick_dec
+            rounded_price = _ceil_to_step(price, price_tick_dec)
 
         logging.debug(
-            f"[{self._market}] qty_step={quantity_step} raw_size={size} -> {rounded_size}; "
-            f"min_qty={min_order_size} | price_tick={price_tick_dec} raw_px={price} -> {rounded_price}"
-            f"current_mid={self._orderbook.mid_price() if hasattr(self, '_orderbook') else 'N/A'}"
+            "[%s] qty_step=%s raw_size=%s -> %s; min_qty=%s | price_tick=%s raw_px=%s -> %s",
+            self._market,
+            quantity_step,
+            size,
+            rounded_size,
+            min_order_size,
+            price_tick_dec,
+            price,
+            rounded_price,
         )
 
         # --- 4) 送單 ---
-        order = await self._client.place_order(
-            market_name=self._market,
-            amount_of_synthetic=rounded_size,
-            price=rounded_price,
-            side=side,
-            post_only=self._post_only,
-            time_in_force=TimeInForce.GTT,
-            self_trade_protection_level=self._stp_level,
-        )
+        async with self._order_slots:
+            order = await self._submit[side](
+                amount_of_synthetic=rounded_size,
+                price=rounded_price,
+                previous_order_id=replacing.external_id if replacing is not None else None,
+            )
+
+        if replacing is not None:
+            # 交易所已以新單取代舊單
+            self._orders.pop(side, None)
+            if self._risk_manager:
+                self._risk_manager.register_cancel()
 
         # --- 5) 記錄 live order ---
         order_id = getattr(order, "id", None)
+        external_id = getattr(order, "external_id", None)
         if order_id is None:
             data = getattr(order, "data", None)
             if data is not None:
                 order_id = getattr(data, "id", None)
+                external_id = getattr(data, "external_id", None)
         if order_id is None:
             return
 
         # 建議把 live 狀態記成「已對齊後的值」
-        self._orders[side] = LiveOrder(order_id=order_id, price=rounded_price, size=rounded_size, side=side)
+        self._orders[side] = LiveOrder(
+            order_id=order_id,
+            price=rounded_price,
+            size=rounded_size,
+            side=side,
+            replace_band=rounded_price * self._threshold,
+            external_id=external_id,
+        )
         if self._risk_manager:
             self._risk_manager.register_order()
 
 
     async def _cancel(self, live: LiveOrder) -> None:
-        await self._client.cancel_order(order_id=live.order_id)
+        try:
+            async with self._order_slots:
+                await self._client.cancel_order(order_id=live.order_id)
+        except ValueError as exc:
+            # 交易所拒絕撤單代表該單已成交、已撤或已被取代，不在簿上即視同撤單成功
+            logging.info(
+                "[%s] cancel of order %s rejected (%s); treating it as already gone",
+                self._market,
+                live.order_id,
+                exc,
+            )
         self._orders.pop(live.side, None)
         if self._risk_manager:
             self._risk_manager.register_cancel()
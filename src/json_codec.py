@@ -0,0 +1,25 @@
+"""JSON helpers backed by orjson when it is installed, with a stdlib fallback."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+
+    def json_pretty(document: str | bytes) -> str:
+        """Re-indent a JSON document for display."""
+        return orjson.dumps(orjson.loads(document), option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:  # pragma: no cover - optional speedup
+    json_loads = json.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def json_pretty(document: str | bytes) -> str:
+        """Re-indent a JSON document for display."""
+        return json.dumps(json.loads(document), indent=2)
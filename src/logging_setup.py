@@ -1,6 +1,8 @@
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
 import sys
 
 # Custom filter to allow only INFO and WARNING level logs
@@ -8,8 +10,16 @@ class InfoFilter(logging.Filter):
     def filter(self, record):
         return record.levelno in (logging.INFO, logging.WARNING)
 
+# Background writer shared by every caller; set on the first setup_logging() call
+_listener = None
+
 def setup_logging():
-    """Configures logging to file and console."""
+    """Configures logging to file and console. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        # Already configured: don't stack another queue handler, listener thread and atexit hook
+        return
+
     # Get the root logger
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
@@ -30,7 +40,6 @@ def setup_logging():
     info_handler.setLevel(logging.INFO)
     info_handler.setFormatter(formatter)
     info_handler.addFilter(InfoFilter()) # Apply the custom filter
-    logger.addHandler(info_handler)
 
     # --- Error Log Handler (error.txt) ---
     # This handler will write ERROR and CRITICAL messages to error.txt
@@ -41,11 +50,25 @@ def setup_logging():
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
 
     # --- Console Log Handler (stdout) ---
     # This handler will print all logs (INFO and above) to the console
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+    # --- Queue hand-off ---
+    # The event loop only enqueues records; a background listener thread does the
+    # file/console writes so disk and terminal latency never stall quoting.
+    log_queue = SimpleQueue()
+    _listener = QueueListener(
+        log_queue,
+        info_handler,
+        error_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    logger.addHandler(QueueHandler(log_queue))
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
@@ -2,20 +2,23 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
-from decimal import Decimal
 from typing import AsyncIterator, Dict, Optional
 
 import websockets
+from pydantic import TypeAdapter
 from websockets.client import WebSocketClientProtocol
 from websockets.exceptions import ConnectionClosed
 
 from .config import EndpointConfig, RuntimeSettings
+from .decimals import to_decimal
+from .json_codec import json_loads
 from .orderbook import OrderBook
 from .schemas import OrderbookLevel, OrderbookSnapshot
 
+_LEVELS_ADAPTER = TypeAdapter(list[OrderbookLevel])
+
 
 class MarketDataSource:
     """Handles streaming public market data."""
@@ -57,7 +60,7 @@ class MarketDataSource:
         """Listens for messages and yields them."""
         while True:
             raw = await ws.recv()
-            yield json.loads(raw)
+            yield json_loads(raw)
 
     def _parse_orderbook(self, market: str, payload: Dict) -> Optional[OrderbookSnapshot]:
         data = payload.get("data", payload)
@@ -78,19 +81,9 @@ class MarketDataSource:
         if not bids or not asks:
             return None
 
-        def _convert(level: Dict | list | tuple) -> OrderbookLevel:
-            if isinstance(level, (list, tuple)) and len(level) >= 2:
-                price, size = level[0], level[1]
-            elif isinstance(level, dict):
-                price = level.get("price") or level.get("p")
-                size = level.get("size") or level.get("quantity") or level.get("q")
-            else:
-                raise ValueError(f"unknown level format: {level}")
-            return OrderbookLevel(price=Decimal(str(price)), size=Decimal(str(size)))
-
         try:
-            bid_levels = [_convert(level) for level in bids]
-            ask_levels = [_convert(level) for level in asks]
+            bid_levels = _parse_levels(bids)
+            ask_levels = _parse_levels(asks)
         except (ValueError, KeyError) as e:
             logging.error(f"[md_source] Error parsing orderbook level: {e}, payload: {payload}")
             return None
@@ -110,6 +103,23 @@ class MarketDataSource:
         return OrderbookSnapshot(market=market_in_message, bids=bid_levels, asks=ask_levels, timestamp=ts)
 
 
+def _level_from_pair(level: list | tuple) -> OrderbookLevel:
+    if len(level) < 2:
+        raise ValueError(f"unknown level format: {level}")
+    return OrderbookLevel(price=to_decimal(level[0]), size=to_decimal(level[1]))
+
+
+def _parse_levels(levels: list) -> list[OrderbookLevel]:
+    """Convert one side of the book, choosing the level format once from its first entry."""
+    first = levels[0]
+    if isinstance(first, dict):
+        # Validating the whole side in one pydantic-core call beats building each level in Python
+        return _LEVELS_ADAPTER.validate_python(levels)
+    if isinstance(first, (list, tuple)):
+        return [_level_from_pair(level) for level in levels]
+    raise ValueError(f"unknown level format: {first}")
+
+
 async def stream_orderbook_to_local_book(book: OrderBook, source: MarketDataSource) -> None:
     """Populate a local OrderBook from the public feed."""
     async for snapshot in source.orderbook_snapshots(book.market):
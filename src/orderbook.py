@@ -1,6 +1,7 @@
 """Local order book reconstruction and statistics."""
 from __future__ import annotations
 
+import heapq
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -9,8 +10,11 @@ from typing import Deque, Dict, Iterable, Optional
 
 from .schemas import OrderbookLevel, OrderbookSnapshot
 
+_ZERO = Decimal("0")
+_SIGMA_CAP = Decimal("0.01")
 
-@dataclass
+
+@dataclass(slots=True)
 class BestBidAsk:
     bid: Optional[OrderbookLevel]
     ask: Optional[OrderbookLevel]
@@ -25,13 +29,25 @@ class OrderBook:
         self.sigma_window = sigma_window
         self._bids: Dict[Decimal, Decimal] = {}
         self._asks: Dict[Decimal, Decimal] = {}
-        self._mid_history: Deque[tuple[datetime, Decimal]] = deque(maxlen=sigma_window)
+        # 每筆記錄 (時間, mid, 相對上一筆的報酬)；報酬和與平方和隨進出窗口增減，sigma 不必重掃整個窗口
+        self._mid_history: Deque[tuple[datetime, Decimal, Optional[Decimal]]] = deque()
+        self._return_sum = _ZERO
+        self._return_sq_sum = _ZERO
+        self._return_count = 0
+        # 最優價/mid/sigma 只在盤口變動時重算，報價迴圈每個 tick 直接讀快取
+        self._best = BestBidAsk(bid=None, ask=None)
+        self._mid: Optional[Decimal] = None
+        self._sigma: Optional[Decimal] = None
+        self._sigma_dirty = False
 
     def ingest_snapshot(self, snapshot: OrderbookSnapshot) -> None:
         if snapshot.market != self.market:
             return
-        self._bids = {level.price: level.size for level in snapshot.bids[: self.max_depth]}
-        self._asks = {level.price: level.size for level in snapshot.asks[: self.max_depth]}
+        # 原地重填，沿用既有 dict 的雜湊表容量
+        self._bids.clear()
+        self._bids.update((level.price, level.size) for level in snapshot.bids[: self.max_depth])
+        self._asks.clear()
+        self._asks.update((level.price, level.size) for level in snapshot.asks[: self.max_depth])
         self._record_mid(snapshot.timestamp)
 
     def apply_levels(self, side: str, levels: Iterable[OrderbookLevel], timestamp: datetime) -> None:
@@ -45,52 +61,86 @@ class OrderBook:
         self._record_mid(timestamp)
 
     def best_prices(self) -> BestBidAsk:
+        """Return the cached top of book; treat the result as read-only."""
+        return self._best
+
+    def mid_price(self) -> Optional[Decimal]:
+        return self._mid
+
+    def _refresh_top(self) -> None:
         bid = max(self._bids.items(), default=None)
         ask = min(self._asks.items(), default=None)
         best_bid = OrderbookLevel(price=bid[0], size=bid[1]) if bid else None
         best_ask = OrderbookLevel(price=ask[0], size=ask[1]) if ask else None
-        return BestBidAsk(bid=best_bid, ask=best_ask)
-
-    def mid_price(self) -> Optional[Decimal]:
-        best = self.best_prices()
-        if not best.bid or not best.ask:
-            return None
-        return (best.bid.price + best.ask.price) / Decimal("2")
+        self._best = BestBidAsk(bid=best_bid, ask=best_ask)
+        if best_bid is None or best_ask is None:
+            self._mid = None
+        else:
+            self._mid = (best_bid.price + best_ask.price) / Decimal("2")
 
     def _truncate_book(self, book: Dict[Decimal, Decimal]) -> None:
         if len(book) <= self.max_depth:
             return
-        sorted_levels = sorted(book.items(), reverse=book is self._bids)
-        trimmed = dict(sorted_levels[: self.max_depth])
+        # 只需保留最優的 max_depth 檔，部分選取比整本排序便宜
+        select = heapq.nlargest if book is self._bids else heapq.nsmallest
+        kept = select(self.max_depth, book.items())
         book.clear()
-        book.update(trimmed)
+        book.update(kept)
 
     def _record_mid(self, timestamp: datetime) -> None:
-        mid = self.mid_price()
+        self._refresh_top()
+        mid = self._mid
         if mid is None:
             return
-        self._mid_history.append((timestamp, mid))
+        history = self._mid_history
+        ret: Optional[Decimal] = None
+        if history:
+            previous = history[-1][1]
+            if previous != 0:
+                ret = (mid - previous) / previous
+                self._return_sum += ret
+                self._return_sq_sum += ret * ret
+                self._return_count += 1
+        history.append((timestamp, mid, ret))
+        if len(history) > self.sigma_window:
+            self._pop_oldest()
         self._drop_stale(timestamp)
+        self._sigma_dirty = True
+
+    def _pop_oldest(self) -> None:
+        history = self._mid_history
+        history.popleft()
+        if not history:
+            return
+        # 新的窗口首筆已沒有前一筆可比，其報酬移出累計
+        timestamp, mid, ret = history[0]
+        if ret is not None:
+            self._return_sum -= ret
+            self._return_sq_sum -= ret * ret
+            self._return_count -= 1
+            history[0] = (timestamp, mid, None)
 
     def _drop_stale(self, now: datetime) -> None:
         cutoff = now - timedelta(seconds=self.sigma_window)
         while self._mid_history and self._mid_history[0][0] < cutoff:
-            self._mid_history.popleft()
+            self._pop_oldest()
 
     def sigma(self) -> Optional[Decimal]:
-        if len(self._mid_history) < 2:
-            return None
-        mids = [value for _, value in self._mid_history]
-        returns: list[Decimal] = []
-        for previous, current in zip(mids[:-1], mids[1:]):
-            if previous == 0:
-                continue
-            returns.append((current - previous) / previous)
-        if not returns:
+        if self._sigma_dirty:
+            self._sigma = self._compute_sigma()
+            self._sigma_dirty = False
+        return self._sigma
+
+    def _compute_sigma(self) -> Optional[Decimal]:
+        count = self._return_count
+        if count == 0:
             return None
-        mean = sum(returns) / Decimal(len(returns))
-        var = sum((r - mean) ** 2 for r in returns) / Decimal(len(returns))
-        std = var.sqrt() if hasattr(var, "sqrt") else Decimal(var ** 0.5)
+        mean = self._return_sum / count
+        var = self._return_sq_sum / count - mean * mean
+        # 累加誤差可能讓極小的變異數略低於 0
+        if var < _ZERO:
+            var = _ZERO
+        std = var.sqrt()
 
         # 添加：將標準差限制在合理範圍
-        return min(std, Decimal("0.01"))
+        return min(std, _SIGMA_CAP)
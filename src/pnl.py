@@ -3,10 +3,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Iterable, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class PnLBreakdown:
     spread_pnl: Decimal
     inventory_pnl: Decimal
@@ -35,8 +35,12 @@ class PnLTracker:
     def record_funding(self, funding: Decimal) -> None:
         self._data.funding += funding
 
-    def mark_to_market(self, inventory: Decimal, current_mid: Decimal, entry_price: Decimal) -> None:
-        self._data.inventory_pnl = (current_mid - entry_price) * inventory
+    def mark_to_market_all(self, positions: Iterable[Tuple[Decimal, Decimal, Decimal]]) -> None:
+        """Set inventory PnL from (inventory, current_mid, entry_price) across all open positions."""
+        total = Decimal("0")
+        for inventory, current_mid, entry_price in positions:
+            total += (current_mid - entry_price) * inventory
+        self._data.inventory_pnl = total
 
     def snapshot(self) -> Dict[str, Decimal]:
         return {
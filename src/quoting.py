@@ -2,13 +2,22 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import ROUND_DOWN, ROUND_UP, Decimal
+from decimal import ROUND_UP, Decimal
 from typing import Optional
 import logging
 import time
 
 from .schemas import QuoteDecision
 
+# 報價熱路徑上重複使用的 Decimal 常數，避免每次 compute_quote 重新解析字串
+_ZERO = Decimal("0")
+_ONE = Decimal("1")
+_TWO = Decimal("2")
+_THREE = Decimal("3")
+_BPS = Decimal("10000")
+_DEFAULT_TICK = Decimal("0.0001")
+_PRICE_BAND = Decimal("0.05")  # 允許 ±5% 偏離
+
 
 @dataclass
 class MarketQuotingConfig:
@@ -37,7 +46,26 @@ class QuoteEngine:
     def __init__(self, config: MarketQuotingConfig) -> None:
         self._config = config
         self._last_ratio_log = 0.0
-        self._last_ratio = Decimal("0")
+        self._last_ratio = _ZERO
+        self._root_logger = logging.getLogger()
+        self._tick = config.price_tick if config.price_tick > 0 else _DEFAULT_TICK
+        # 以下皆為設定的純函數，建構時算一次，compute_quote 直接取用
+        self._k_term = config.k_relative_bps / _BPS
+        self._aged_k_term = (
+            self._k_term * config.position_age_k_multiplier
+            if config.position_age_k_multiplier > _ZERO
+            else self._k_term
+        )
+        self._inventory_spread_coeff = config.inventory_spread_multiplier * config.base_spread
+        age_spread = config.position_age_spread_multiplier if config.position_age_spread_multiplier > _ZERO else _ZERO
+        self._age_spread = age_spread
+        self._aged_spread_factor = _ONE + age_spread
+        self._aged_sensitivity = config.inventory_sensitivity * (_ONE + age_spread / _TWO)
+        threshold = config.inventory_disable_same_side_threshold
+        self._same_side_threshold = _ONE if threshold <= _ZERO or threshold > _ONE else threshold
+        # 簿面靜止時 mid 不變，記住上一次的 base size 免去重複的 Decimal 除法
+        self._base_size_mid: Optional[Decimal] = None
+        self._base_size_value = _ZERO
 
     def compute_quote(
         self,
@@ -49,127 +77,118 @@ class QuoteEngine:
         best_bid: Optional[Decimal] = None,
         best_ask: Optional[Decimal] = None,
     ) -> QuoteDecision:
+        config = self._config
         # 🔥 核心修改 1：根據庫存佔資金比例調整公允價格（相對 K）
-        cap = self._config.quote_notional_cap
+        cap = config.quote_notional_cap
         inventory_notional = abs(inventory) * mid_price
-        if cap > Decimal("0"):
-            inventory_ratio = min(inventory_notional / cap, Decimal("1"))
+        if cap > _ZERO:
+            inventory_ratio = inventory_notional / cap
+            if inventory_ratio > _ONE:
+                inventory_ratio = _ONE
         else:
-            inventory_ratio = Decimal("0")
-
-        now = time.monotonic()
-        if now - self._last_ratio_log >= 60.0:
-            logging.info(
-                "[%s] inventory_ratio=%.4f (inventory=%s, cap=%s, mid=%s)",
-                self._config.market,
-                float(inventory_ratio),
-                str(inventory),
-                str(cap),
-                str(mid_price),
-            )
-            self._last_ratio_log = now
+            inventory_ratio = _ZERO
+
+        # 日誌層級高於 INFO 時連 monotonic() 也不必呼叫
+        if self._root_logger.isEnabledFor(logging.INFO):
+            now = time.monotonic()
+            if now - self._last_ratio_log >= 60.0:
+                logging.info(
+                    "[%s] inventory_ratio=%.4f (inventory=%s, cap=%s, mid=%s)",
+                    config.market,
+                    float(inventory_ratio),
+                    inventory,
+                    cap,
+                    mid_price,
+                )
+                self._last_ratio_log = now
         self._last_ratio = inventory_ratio
 
         position_age_triggered = (
             position_age_minutes is not None
-            and self._config.position_age_minutes > 0
-            and position_age_minutes >= self._config.position_age_minutes
+            and config.position_age_minutes > 0
+            and position_age_minutes >= config.position_age_minutes
         )
 
-        if inventory > Decimal("0"):
-            direction = Decimal("1")
-        elif inventory < Decimal("0"):
-            direction = Decimal("-1")
-        else:
-            direction = Decimal("0")
+        # int 形式的 -1/0/1，與 Decimal 相乘不需要額外建構物件
+        direction = (inventory > _ZERO) - (inventory < _ZERO)
 
-        k_multiplier = Decimal("1")
-        if position_age_triggered and self._config.position_age_k_multiplier > Decimal("0"):
-            k_multiplier *= self._config.position_age_k_multiplier
-
-        k_term = (self._config.k_relative_bps / Decimal("10000")) * k_multiplier
-        inventory_price_adjustment = direction * mid_price * k_term * inventory_ratio
+        k_term = self._aged_k_term if position_age_triggered else self._k_term
+        # 三處公允價偏移都以 direction * mid 為首項，算一次共用
+        signed_mid = direction * mid_price
+        inventory_price_adjustment = signed_mid * k_term * inventory_ratio
         fair_price = mid_price - inventory_price_adjustment
 
-        sigma_term = sigma if sigma is not None else Decimal("0")
-        funding_term = funding_rate if funding_rate is not None else Decimal("0")
+        sigma_term = sigma if sigma is not None else _ZERO
+        funding_term = funding_rate if funding_rate is not None else _ZERO
 
-        dynamic_multiplier = Decimal("1") + (self._config.volatility_spread_multiplier * sigma_term)
-        if dynamic_multiplier < Decimal("0"):
-            dynamic_multiplier = Decimal("0")
-        base_component = self._config.base_spread * dynamic_multiplier
+        dynamic_multiplier = _ONE + (config.volatility_spread_multiplier * sigma_term)
+        if dynamic_multiplier < _ZERO:
+            dynamic_multiplier = _ZERO
+        base_component = config.base_spread * dynamic_multiplier
 
-        inventory_spread_adjustment = (
-            inventory_ratio * self._config.inventory_spread_multiplier * self._config.base_spread
-        )
+        inventory_spread_adjustment = inventory_ratio * self._inventory_spread_coeff
 
-        funding_component = self._config.beta * abs(funding_term)
-        half_spread = base_component + (self._config.alpha * sigma_term) + funding_component + inventory_spread_adjustment
+        funding_component = config.beta * abs(funding_term)
+        half_spread = base_component + (config.alpha * sigma_term) + funding_component + inventory_spread_adjustment
 
-        age_spread_multiplier = Decimal("1")
-        if position_age_triggered and self._config.position_age_spread_multiplier > Decimal("0"):
-            age_spread_multiplier += self._config.position_age_spread_multiplier
-        half_spread *= age_spread_multiplier
+        if position_age_triggered:
+            half_spread *= self._aged_spread_factor
 
-        if self._config.min_half_spread > Decimal("0") and half_spread < self._config.min_half_spread:
-            half_spread = self._config.min_half_spread
+        if config.min_half_spread > _ZERO and half_spread < config.min_half_spread:
+            half_spread = config.min_half_spread
 
-        funding_bias = self._config.funding_bias_strength * funding_term * inventory_ratio
+        funding_bias = config.funding_bias_strength * funding_term * inventory_ratio
         if funding_bias != 0 and direction != 0:
-            fair_price -= direction * mid_price * funding_bias
+            fair_price -= signed_mid * funding_bias
 
-        if position_age_triggered and direction != 0 and self._config.position_age_spread_multiplier > Decimal("0"):
-            flatten_bias = inventory_ratio * self._config.position_age_spread_multiplier
-            fair_price -= direction * mid_price * flatten_bias
+        if position_age_triggered and direction != 0 and self._age_spread > _ZERO:
+            flatten_bias = inventory_ratio * self._age_spread
+            fair_price -= signed_mid * flatten_bias
         
-        raw_bid = fair_price * (Decimal("1") - half_spread)
-        raw_ask = fair_price * (Decimal("1") + half_spread)
+        raw_bid = fair_price * (_ONE - half_spread)
+        raw_ask = fair_price * (_ONE + half_spread)
 
-        tick = self._config.price_tick if self._config.price_tick > 0 else Decimal("0.0001")
+        tick = self._tick
 
-        bid_price = self._sanitize_price(raw_bid, tick, is_bid=True)
-        ask_price = self._sanitize_price(raw_ask, tick, is_bid=False)
+        bid_price = self._sanitize_price(raw_bid, is_bid=True)
+        ask_price = self._sanitize_price(raw_ask, is_bid=False)
 
         book_valid = (
             best_bid is not None
             and best_ask is not None
-            and best_bid > Decimal("0")
-            and best_ask > Decimal("0")
+            and best_bid > _ZERO
+            and best_ask > _ZERO
             and best_ask - best_bid >= tick
         )
 
         if book_valid:
-            buffer_ticks = Decimal("1")
-            if self._last_ratio > Decimal("0"):
-                buffer_ticks += (self._last_ratio * Decimal("1")).to_integral_value(rounding=ROUND_UP)
-            if buffer_ticks < Decimal("1"):
-                buffer_ticks = Decimal("1")
-            if buffer_ticks > Decimal("3"):
-                buffer_ticks = Decimal("3")
+            buffer_ticks = _ONE
+            if self._last_ratio > _ZERO:
+                buffer_ticks += self._last_ratio.to_integral_value(rounding=ROUND_UP)
+            buffer_ticks = min(max(buffer_ticks, _ONE), _THREE)
 
             if bid_price >= best_ask:
                 adjusted_bid = best_ask - tick * buffer_ticks
-                bid_price = self._sanitize_price(adjusted_bid, tick, is_bid=True)
+                bid_price = self._sanitize_price(adjusted_bid, is_bid=True)
             if ask_price <= best_bid:
                 adjusted_ask = best_bid + tick * buffer_ticks
-                ask_price = self._sanitize_price(adjusted_ask, tick, is_bid=False)
+                ask_price = self._sanitize_price(adjusted_ask, is_bid=False)
 
         # 若簿面不穩定或調整後的價格偏離中價太多，直接取消該方向下單
-        price_band = Decimal("0.05")  # 允許 ±5% 偏離
-        max_deviation = mid_price * price_band
+        max_deviation = mid_price * _PRICE_BAND
+        lower_bound = mid_price - max_deviation
+        upper_bound = mid_price + max_deviation
 
-        if bid_price <= Decimal("0") or abs(bid_price - mid_price) > max_deviation:
-            bid_price = Decimal("0")
-            bid_size = Decimal("0")
-        if ask_price <= Decimal("0") or abs(ask_price - mid_price) > max_deviation:
-            ask_price = Decimal("0")
-            ask_size = Decimal("0")
+        if bid_price <= _ZERO or not lower_bound <= bid_price <= upper_bound:
+            bid_price = _ZERO
+            bid_size = _ZERO
+        if ask_price <= _ZERO or not lower_bound <= ask_price <= upper_bound:
+            ask_price = _ZERO
+            ask_size = _ZERO
 
         # 🔥 核心修改 3：根據庫存方向與比例調整訂單大小
         base_size = self._base_size(mid_price)
-        inventory_sensitivity = self._config.inventory_sensitivity
-        if position_age_triggered and self._config.position_age_spread_multiplier > Decimal("0"):
-            inventory_sensitivity *= Decimal("1") + (self._config.position_age_spread_multiplier / Decimal("2"))
+        inventory_sensitivity = self._aged_sensitivity if position_age_triggered else config.inventory_sensitivity
         skew = direction * base_size * inventory_sensitivity * inventory_ratio
 
         # 持有多單時：減小買單、增大賣單
@@ -178,20 +197,14 @@ class QuoteEngine:
         ask_size = self._clip_size(base_size + skew)
 
         # 🔥 新增：極端情況處理 - 如果庫存過大，完全取消同向訂單
-        inventory_threshold_ratio = self._config.inventory_disable_same_side_threshold
-        if inventory_threshold_ratio <= Decimal("0"):
-            inventory_threshold_ratio = Decimal("1")
-        if inventory_threshold_ratio > Decimal("1"):
-            inventory_threshold_ratio = Decimal("1")
-
-        if inventory_ratio > inventory_threshold_ratio:
+        if inventory_ratio > self._same_side_threshold:
             if direction > 0:
-                bid_size = Decimal("0")
+                bid_size = _ZERO
             elif direction < 0:
-                ask_size = Decimal("0")
+                ask_size = _ZERO
 
         return QuoteDecision(
-            market=self._config.market,
+            market=config.market,
             bid_price=bid_price,
             bid_size=bid_size,
             ask_price=ask_price,
@@ -208,53 +221,47 @@ class QuoteEngine:
         return self._last_ratio
 
     def _base_size(self, mid_price: Decimal) -> Decimal:
-        if mid_price <= Decimal("0"):
-            return Decimal("0")
+        if mid_price <= _ZERO:
+            return _ZERO
+        if mid_price == self._base_size_mid:
+            return self._base_size_value
         cap_size = self._config.quote_notional_cap / mid_price
-        return self._clip_size(cap_size)
+        self._base_size_value = self._clip_size(cap_size)
+        self._base_size_mid = mid_price
+        return self._base_size_value
 
     def _clip_size(self, size: Decimal) -> Decimal:
-        if size <= Decimal("0"):
-            return Decimal("0")
+        if size <= _ZERO:
+            return _ZERO
 
-        adjusted = max(size, self._config.min_order_size)
-        if self._config.max_order_size is not None and adjusted > self._config.max_order_size:
-            return self._config.max_order_size
+        config = self._config
+        adjusted = max(size, config.min_order_size)
+        if config.max_order_size is not None and adjusted > config.max_order_size:
+            return config.max_order_size
         return adjusted
 
-    def _sanitize_price(self, price: Decimal, tick: Decimal, *, is_bid: bool) -> Decimal:
+    def _sanitize_price(self, price: Decimal, *, is_bid: bool) -> Decimal:
         """Ensure price aligns to tick and remains positive."""
 
-        if tick <= Decimal("0"):
-            tick = Decimal("0.0001")
-
-        if price <= Decimal("0"):
+        tick = self._tick
+        if price <= _ZERO:
             price = tick
 
-        if is_bid:
-            units = (price / tick).to_integral_value(rounding=ROUND_DOWN)
-        else:
-            units = (price / tick).to_integral_value(rounding=ROUND_UP)
-
-        sanitized = units * tick
-        if sanitized <= Decimal("0"):
+        sanitized = self._floor_to_tick(price) if is_bid else self._ceil_to_tick(price)
+        if sanitized <= _ZERO:
             sanitized = tick
         return sanitized
 
     def _floor_to_tick(self, price: Decimal) -> Decimal:
         if price <= 0:
-            return Decimal("0")
-        step = self._config.price_tick
-        if step <= 0:
-            return price
-        multiples = (price / step).quantize(Decimal("1"), rounding=ROUND_DOWN)
-        return multiples * step
+            return _ZERO
+        # 價格為正時 Decimal 的 // 即為向下取整，省去除法後再 quantize
+        return (price // self._tick) * self._tick
 
     def _ceil_to_tick(self, price: Decimal) -> Decimal:
         if price <= 0:
-            return Decimal("0")
-        step = self._config.price_tick
-        if step <= 0:
-            return price
-        multiples = (price / step).quantize(Decimal("1"), rounding=ROUND_UP)
-        return multiples * step
+            return _ZERO
+        multiples, remainder = divmod(price, self._tick)
+        if remainder:
+            multiples += _ONE
+        return multiples * self._tick
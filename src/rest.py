@@ -7,12 +7,25 @@ import httpx
 from tenacity import AsyncRetrying, RetryError, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from .config import EndpointConfig, RuntimeSettings
+from .json_codec import json_dumps, json_loads
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _decode(response: httpx.Response) -> Dict[str, Any]:
+    # Some endpoints (e.g. the dead man's switch) acknowledge with an empty body.
+    if not response.content:
+        return {}
+    return json_loads(response.content)
 
 
 class RateLimitError(Exception):
     """Raised when the API responds with HTTP 429."""
 
 
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError, RateLimitError)
+
+
 class RestClient:
     """Thin wrapper around httpx.AsyncClient with retry logic."""
 
@@ -24,11 +37,21 @@ class RestClient:
             headers["X-Api-Key"] = settings.api_key
 
         timeout = httpx.Timeout(connect=5.0, read=10.0, write=5.0, pool=5.0)
-        self._client = httpx.AsyncClient(base_url=str(endpoints.rest_base), headers=headers, timeout=timeout)
+        # HTTP/2 lets concurrent requests (e.g. parallel history pagination) share one connection.
+        # 行情平靜時下單間隔可能拉長，延長閒置連線的保留時間以免重新 TLS 握手
+        limits = httpx.Limits(max_keepalive_connections=8, max_connections=32, keepalive_expiry=30.0)
+        self._client = httpx.AsyncClient(
+            base_url=str(endpoints.rest_base),
+            headers=headers,
+            timeout=timeout,
+            limits=limits,
+            http2=True,
+        )
 
     async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        # AsyncRetrying 帶有每次請求的重試狀態，需逐次建立，不可在並發請求間共用
         async for attempt in AsyncRetrying(
-            retry=retry_if_exception_type((httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError, RateLimitError)),
+            retry=retry_if_exception_type(_RETRYABLE_ERRORS),
             wait=wait_exponential(multiplier=0.5, min=0.5, max=8.0),
             stop=stop_after_attempt(5),
             reraise=True,
@@ -43,17 +66,21 @@ class RestClient:
 
     async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         response = await self._send("GET", path, params=params)
-        return response.json()
+        return _decode(response)
 
     async def post(
         self, path: str, json: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        response = await self._send("POST", path, json=json, params=params)
-        return response.json()
+        if json is None:
+            response = await self._send("POST", path, params=params)
+        else:
+            # 自行序列化請求本體，略過 httpx 內建的標準庫 json
+            response = await self._send("POST", path, content=json_dumps(json), headers=_JSON_HEADERS, params=params)
+        return _decode(response)
 
     async def delete(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         response = await self._send("DELETE", path, params=params)
-        return response.json()
+        return _decode(response)
 
     async def aclose(self) -> None:
         await self._client.aclose()
@@ -8,6 +8,8 @@ from typing import Optional
 
 from .schemas import CircuitBreakerState
 
+_ZERO = Decimal("0")
+
 
 @dataclass
 class RiskConfig:
@@ -28,19 +30,20 @@ class RiskManager:
         self._config.max_order_size = max_order_size
 
     def can_place_order(self, current_position: Decimal, order_size: Decimal, side: int = 1) -> bool:
-        if order_size <= Decimal("0"):
+        if order_size <= _ZERO:
             return False
 
-        next_position = current_position + (order_size * Decimal(side))
-
-        if self._config.max_net_position > Decimal("0"):
-            if abs(next_position) > self._config.max_net_position:
-                return False
+        config = self._config
+        # 先檢查最便宜的整數條件；Decimal 可直接乘 int，不必為 side 建立 Decimal
+        if self._open_orders >= config.max_open_orders:
+            return False
 
-        if self._config.max_order_size > Decimal("0") and order_size > self._config.max_order_size:
+        max_order_size = config.max_order_size
+        if max_order_size > _ZERO and order_size > max_order_size:
             return False
 
-        if self._open_orders >= self._config.max_open_orders:
+        max_net_position = config.max_net_position
+        if max_net_position > _ZERO and abs(current_position + order_size * side) > max_net_position:
             return False
 
         return True
@@ -5,12 +5,13 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class OrderbookLevel(BaseModel):
-    price: Decimal
-    size: Decimal
+    # 行情推送的檔位可能是 {"p", "q"} 短鍵，讓 pydantic-core 直接批次解析
+    price: Decimal = Field(validation_alias=AliasChoices("price", "p"))
+    size: Decimal = Field(validation_alias=AliasChoices("size", "quantity", "q"))
 
 
 class OrderbookSnapshot(BaseModel):
@@ -1,10 +1,18 @@
 
 import asyncio
-import json
 import os
+import sys
+from pathlib import Path
 import websockets
 from dotenv import load_dotenv
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.event_loop import install_uvloop
+from src.json_codec import json_pretty
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -29,7 +37,14 @@ async def listen_account_updates():
     """Connects to the private account WebSocket and prints all incoming messages."""
     print(f"--- Attempting to connect to: {URL} ---")
     try:
-        async with websockets.connect(URL, extra_headers=HEADERS, ping_interval=15, ping_timeout=10) as ws:
+        async with websockets.connect(
+            URL,
+            extra_headers=HEADERS,
+            ping_interval=15,
+            ping_timeout=10,
+            compression=None,
+            max_queue=1024,
+        ) as ws:
             print("--- ✅ Connection SUCCESSFUL ---")
             print("--- Waiting for account updates (e.g., orders, positions, trades)... ---")
             print("--- You can now go to the exchange website and manually place or cancel an order to trigger an event. ---")
@@ -39,7 +54,7 @@ async def listen_account_updates():
                     message = await ws.recv()
                     print("\n--- 🎉 Received Message: ---")
                     # Pretty print the JSON message
-                    print(json.dumps(json.loads(message), indent=2))
+                    print(json_pretty(message))
                 except websockets.exceptions.ConnectionClosed as e:
                     print(f"--- ❌ Connection closed unexpectedly: {e} ---")
                     break
@@ -53,6 +68,7 @@ async def listen_account_updates():
         print(f"--- ❌ FAILED to connect with an unexpected error: {e} ---")
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(listen_account_updates())
     except KeyboardInterrupt:
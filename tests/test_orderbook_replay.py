@@ -4,10 +4,13 @@ from decimal import Decimal
 from src.orderbook import OrderBook
 from src.schemas import OrderbookLevel, OrderbookSnapshot
 
+HALF_SPREAD = Decimal("10")
+LEVEL_SIZE = Decimal("1")
+
 
 def make_snapshot(mid: Decimal) -> OrderbookSnapshot:
-    bids = [OrderbookLevel(price=mid - Decimal("10"), size=Decimal("1"))]
-    asks = [OrderbookLevel(price=mid + Decimal("10"), size=Decimal("1"))]
+    bids = [OrderbookLevel(price=mid - HALF_SPREAD, size=LEVEL_SIZE)]
+    asks = [OrderbookLevel(price=mid + HALF_SPREAD, size=LEVEL_SIZE)]
     return OrderbookSnapshot(market="BTC-USD", bids=bids, asks=asks, timestamp=datetime.now(timezone.utc))
 
 
@@ -21,3 +24,30 @@ def test_orderbook_mid_and_sigma():
     sigma = book.sigma()
     assert sigma is not None
     assert sigma >= Decimal("0")
+
+
+def test_orderbook_cached_mid_follows_level_updates():
+    book = OrderBook(market="BTC-USD")
+    book.ingest_snapshot(make_snapshot(Decimal("63000")))
+    first_sigma = book.sigma()
+    book.apply_levels(
+        "ask",
+        [OrderbookLevel(price=Decimal("63002"), size=Decimal("1"))],
+        datetime.now(timezone.utc),
+    )
+    assert book.mid_price() == Decimal("62996")
+    assert book.best_prices().ask.price == Decimal("63002")
+    assert first_sigma is None
+    assert book.sigma() is not None
+
+
+def test_orderbook_sigma_tracks_sliding_window():
+    book = OrderBook(market="BTC-USD", sigma_window=3)
+    mids = [Decimal("63000"), Decimal("63020"), Decimal("63010"), Decimal("63050"), Decimal("63040")]
+    for mid in mids:
+        book.ingest_snapshot(make_snapshot(mid))
+    window = mids[-3:]
+    returns = [(current - previous) / previous for previous, current in zip(window, window[1:])]
+    mean = sum(returns) / len(returns)
+    expected = (sum((r - mean) ** 2 for r in returns) / len(returns)).sqrt()
+    assert abs(book.sigma() - expected) < Decimal("1e-20")
@@ -1,17 +1,29 @@
 from decimal import Decimal
 
+import pytest
+
 from src.risk import RiskConfig, RiskManager
 
 
-def test_risk_limits_block_excess_position():
+@pytest.mark.parametrize(
+    "position, size, side, expected",
+    [
+        (Decimal("0.4"), Decimal("0.4"), 1, True),
+        (Decimal("0.8"), Decimal("0.4"), 1, False),
+        (Decimal("0.8"), Decimal("0.4"), -1, True),
+        (Decimal("-0.8"), Decimal("0.4"), -1, False),
+        (Decimal("0"), Decimal("0.6"), 1, False),
+        (Decimal("0"), Decimal("0"), 1, False),
+    ],
+)
+def test_risk_limits_block_excess_position(position, size, side, expected):
     cfg = RiskConfig(
         max_net_position=Decimal("1"),
         max_order_size=Decimal("0.5"),
         max_open_orders=2,
     )
     risk = RiskManager(cfg)
-    assert risk.can_place_order(Decimal("0.4"), Decimal("0.4"))
-    assert not risk.can_place_order(Decimal("0.8"), Decimal("0.4"))
+    assert risk.can_place_order(position, size, side=side) is expected
 
 
 def test_risk_limits_open_order_tracking():
@@ -1,10 +1,18 @@
 
 import asyncio
-import json
 import websockets
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.event_loop import install_uvloop
+from src.json_codec import json_pretty
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -30,7 +38,14 @@ async def listen():
     """Connects to the WebSocket and prints all incoming messages."""
     print(f"--- Connecting to: {URL} ---")
     try:
-        async with websockets.connect(URL, extra_headers=HEADERS, ping_interval=60, ping_timeout=30) as ws:
+        async with websockets.connect(
+            URL,
+            extra_headers=HEADERS,
+            ping_interval=60,
+            ping_timeout=30,
+            compression=None,
+            max_queue=1024,
+        ) as ws:
             print("--- Connection SUCCESSFUL ---")
             print("--- Waiting for messages... (Will time out after 25 seconds if nothing is received) ---")
             while True:
@@ -38,7 +53,7 @@ async def listen():
                     message = await asyncio.wait_for(ws.recv(), timeout=25.0)
                     print("--- Received message: ---")
                     # Pretty print the JSON message
-                    print(json.dumps(json.loads(message), indent=2))
+                    print(json_pretty(message))
                 except asyncio.TimeoutError:
                     print("--- No message received for 25 seconds. The data stream is not active. Terminating. ---")
                     break
@@ -52,4 +67,5 @@ async def listen():
         print(f"--- FAILED to connect: {e} ---")
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(listen())